@@ -1,9 +1,26 @@
+import argparse
+import bisect
 import csv
+import functools
+import hashlib
+import heapq
+import json
+import mmap
+import multiprocessing
+import os
+import pickle
+import struct
 import sys
+import time
 
-from util import Node, StackFrontier, QueueFrontier
+from array import array
+from collections import deque
+from collections.abc import Mapping, MutableMapping
 
-# Maps names to a set of corresponding person_ids
+from search import graph_search
+
+# Maps names to a set of corresponding person_ids; with the csr backend,
+# a `NamesView` that builds the mapping on first use
 names = {}
 
 # Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
@@ -12,11 +29,116 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed CSR co-star graph, set when loaded with backend="csr"
+graph = None
+
+# Binary snapshot of a CSR graph, written next to the CSV files
+SNAPSHOT_FILE = "degrees.snapshot"
+SNAPSHOT_MAGIC = b"DEGSNAP\0"
+SNAPSHOT_VERSION = 1
+SOURCE_FILES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Incremental updates applied on top of a snapshot, one JSON record per line
+# after a header naming the journal and the CSVs the updates extend
+JOURNAL_SUFFIX = ".journal"
+journal_path = None
+journal_length = 0
+journal_id = None
+journal_sources = None
+
+# Landmark distance index over the CSR graph, set by `load_landmarks`
+landmarks = None
+
+# Search used by `find_path`: "bidirectional" or landmark-guided "astar"
+search_algorithm = "bidirectional"
+
+# `SearchStats` of the last one-sided `shortest_path` search
+search_stats = None
+
+# Prefix/token/fuzzy name index, built on first use by `get_name_index`
+name_index = None
 
-def load_data(directory):
+# Ranked candidates kept per name prefix, and how many prefixes to keep
+PREFIX_TOP = 100
+PREFIX_CACHE_SIZE = 4096
+
+# Persisted landmark index, written next to the CSV files
+LANDMARK_FILE = "degrees.landmarks"
+LANDMARK_MAGIC = b"DEGLMK\0\0"
+LANDMARK_VERSION = 1
+
+# Landmark distance meaning "not reachable"; real distances are capped below it
+UNREACHED = 255
+
+
+def load_data(directory, backend="dict", snapshot=True):
     """
     Load data from CSV files into memory.
+
+    With backend="dict", fills `people` and `movies` with per-record
+    dictionaries. With backend="csr", builds a compact `CoStarGraph`
+    instead and exposes `people` and `movies` as read-only views of it.
+
+    With the csr backend and `snapshot` enabled, a binary snapshot of the
+    graph is memory-mapped instead of parsing the CSVs when it is still
+    current, and (re)written after parsing when it is missing or stale.
     """
+    global graph, names, people, movies, landmarks, name_index
+    global journal_path, journal_length, journal_id, journal_sources
+
+    landmarks = None
+    name_index = None
+    journal_path = None
+    journal_length = 0
+    journal_id = None
+    journal_sources = None
+    if backend == "csr":
+        if not snapshot:
+            install_graph(CoStarGraph.from_csv(directory))
+            return
+        path = os.path.join(directory, SNAPSHOT_FILE)
+        loaded = read_snapshot(path, directory)
+        rebuilt = loaded is None
+        if rebuilt:
+            sources = source_stats(directory)
+            loaded = CoStarGraph.from_csv(directory)
+            loaded.sources = sources
+            try:
+                write_snapshot(loaded, path, sources)
+            except OSError:
+                install_graph(loaded)
+                return
+        install_graph(loaded)
+
+        # Keep the journal if its updates were made on top of these same
+        # CSVs, even when the snapshot itself had to be rebuilt
+        journal_path = path + JOURNAL_SUFFIX
+        journal_sources = loaded.sources
+        header = read_journal_header(journal_path)
+        if header is not None and same_sources(header.get("sources"), loaded.sources):
+            journal_id = header.get("journal")
+        elif header is None and not rebuilt and os.path.exists(journal_path):
+            # A journal without a header extends the snapshot it sits beside
+            start_journal(list(read_journal(journal_path)))
+        else:
+            try:
+                os.remove(journal_path)
+            except FileNotFoundError:
+                pass
+
+        # Replay updates made since the snapshot was written
+        for record in read_journal(journal_path):
+            apply_update(record)
+            journal_length += 1
+        return
+    elif backend != "dict":
+        raise ValueError(f"unknown backend: {backend}")
+
+    graph = None
+    names = {}
+    people = {}
+    movies = {}
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -52,14 +174,490 @@ def load_data(directory):
                 pass
 
 
+def source_stats(directory, hashed=True):
+    """
+    Returns the size, mtime and (optionally) SHA-256 of each CSV file,
+    used to key a snapshot to the data it was built from.
+    """
+    stats = {}
+    for filename in SOURCE_FILES:
+        path = os.path.join(directory, filename)
+        st = os.stat(path)
+        stats[filename] = {"size": st.st_size, "mtime": st.st_mtime_ns}
+        if hashed:
+            stats[filename]["sha256"] = file_digest(path)
+    return stats
+
+
+def file_digest(path):
+    """
+    Returns the hex SHA-256 digest of the file at `path`.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def check_sources(recorded, directory):
+    """
+    Checks recorded source stats against the CSV files in `directory`.
+    Returns (current, touched). Size and mtime matching is enough; if
+    only the mtime moved, the file contents are hashed before declaring
+    the snapshot stale. When the hashes still match, `recorded` is given
+    the new mtimes and `touched` is True, so the caller can save them.
+    """
+    try:
+        current = source_stats(directory, hashed=False)
+    except OSError:
+        return False, False
+    touched = False
+    for filename, stat in current.items():
+        old = recorded.get(filename)
+        if old is None or old["size"] != stat["size"]:
+            return False, False
+        if old["mtime"] != stat["mtime"]:
+            path = os.path.join(directory, filename)
+            if old["sha256"] != file_digest(path):
+                return False, False
+            old["mtime"] = stat["mtime"]
+            touched = True
+    return True, touched
+
+
+def read_header(mapping, magic, version):
+    """
+    Parses the magic, version and JSON header at the start of a mapped
+    snapshot or landmark file. Returns (header, offset of the data after
+    it), or None if the file is truncated, of another version or written
+    on a platform with another byte order or int size.
+    """
+    prefix = len(magic) + 8
+    if len(mapping) < prefix or mapping[:len(magic)] != magic:
+        return None
+    found, header_length = struct.unpack("<II", mapping[len(magic):prefix])
+    if found != version or len(mapping) < prefix + header_length:
+        return None
+    try:
+        header = json.loads(mapping[prefix:prefix + header_length])
+        if header["byteorder"] != sys.byteorder or \
+                header["itemsize"] != array("i").itemsize:
+            return None
+    except (ValueError, KeyError, TypeError):
+        return None
+    return header, prefix + header_length
+
+
+def rewrite_header(path, magic, header, end):
+    """
+    Rewrites the JSON header of the file at `path` in place, padded to
+    the length of the old one, which ended at offset `end`. Does nothing
+    if the new header does not fit or the file cannot be written.
+    """
+    prefix = len(magic) + 8
+    data = json.dumps(header).encode("utf-8")
+    if len(data) > end - prefix:
+        return
+    try:
+        with open(path, "r+b") as f:
+            f.seek(prefix)
+            f.write(data + b" " * (end - prefix - len(data)))
+    except OSError:
+        pass
+
+
+def write_snapshot(snapshot_graph, path, sources):
+    """
+    Writes `snapshot_graph` to `path` as a versioned binary snapshot:
+    magic, version, a JSON header, the raw CSR int arrays and a pickled
+    block of ids and metadata. The file is replaced atomically.
+    """
+    metadata = pickle.dumps((
+        snapshot_graph.person_ids, snapshot_graph.person_names,
+        snapshot_graph.person_births, snapshot_graph.movie_ids,
+        snapshot_graph.movie_titles, snapshot_graph.movie_years
+    ), protocol=pickle.HIGHEST_PROTOCOL)
+
+    blocks = [
+        ("person_offsets", snapshot_graph.person_offsets),
+        ("person_movies", snapshot_graph.person_movies),
+        ("movie_offsets", snapshot_graph.movie_offsets),
+        ("movie_people", snapshot_graph.movie_people)
+    ]
+    blocks = [(name, array("i", values).tobytes()) for name, values in blocks]
+    blocks.append(("metadata", metadata))
+
+    # Lay out every block on an 8-byte boundary after the header
+    layout = {}
+    offset = 0
+    for name, data in blocks:
+        layout[name] = [offset, len(data)]
+        offset += len(data) + (-len(data) % 8)
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "itemsize": array("i").itemsize,
+        "sources": sources,
+        "blocks": layout
+    }).encode("utf-8")
+    header += b" " * (-(len(SNAPSHOT_MAGIC) + 8 + len(header)) % 8)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack("<II", SNAPSHOT_VERSION, len(header)))
+        f.write(header)
+        for _, data in blocks:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path, directory):
+    """
+    Memory-maps the snapshot at `path` and returns it as a `CoStarGraph`
+    whose CSR arrays are views of the mapping. Returns None if there is
+    no usable snapshot or it no longer matches the CSVs in `directory`.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    parsed = read_header(mapping, SNAPSHOT_MAGIC, SNAPSHOT_VERSION)
+    if parsed is None:
+        return None
+    header, start = parsed
+
+    # A damaged or truncated snapshot is treated as missing and rebuilt
+    try:
+        current, touched = check_sources(header["sources"], directory)
+        if not current:
+            return None
+        view = memoryview(mapping)
+        blocks = {}
+        for name, (offset, length) in header["blocks"].items():
+            if start + offset + length > len(mapping):
+                return None
+            blocks[name] = view[start + offset:start + offset + length]
+
+        (person_ids, person_names, person_births,
+         movie_ids, movie_titles, movie_years) = pickle.loads(blocks["metadata"])
+        loaded = CoStarGraph(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            blocks["person_offsets"].cast("i"),
+            blocks["person_movies"].cast("i"),
+            blocks["movie_offsets"].cast("i"),
+            blocks["movie_people"].cast("i")
+        )
+    except (KeyError, TypeError, ValueError, EOFError, pickle.UnpicklingError):
+        return None
+
+    # Record new mtimes of unchanged CSVs so they are not hashed every load
+    if touched:
+        rewrite_header(path, SNAPSHOT_MAGIC, header, start)
+    loaded.sources = header["sources"]
+    loaded.mapping = mapping
+    return loaded
+
+
+def load_landmarks(directory, k=16):
+    """
+    Loads the landmark index for the CSR graph loaded from `directory`,
+    building and saving it with `k` landmarks if it is missing or stale.
+    A saved index that predates journaled updates is caught up in place;
+    one built on top of another journal's updates is rebuilt.
+    """
+    global landmarks
+
+    if graph is None:
+        raise ValueError("landmarks require the csr backend")
+    path = os.path.join(directory, LANDMARK_FILE)
+    index = LandmarkIndex.load(path, directory)
+    if index is not None and (len(index.landmarks) != min(k, len(graph.person_ids))
+                              or index.journal > journal_length
+                              or index.journal and index.journal_id != journal_id):
+        index = None
+
+    if index is None:
+        sources = source_stats(directory)
+        index = LandmarkIndex.build(graph, k)
+        index.journal = journal_length
+        index.journal_id = journal_id
+        try:
+            index.save(path, sources)
+        except OSError:
+            pass
+    elif index.journal < journal_length:
+        records = list(read_journal(journal_path))[index.journal:]
+        for kind, values in records:
+            if kind == "person":
+                index.add_person()
+        for kind, values in records:
+            if kind == "star":
+                index.add_star(
+                    graph, graph.person_index[values[0]], graph.movie_index[values[1]]
+                )
+    landmarks = index
+    return index
+
+
+def add_person(person_id, name, birth):
+    """
+    Adds a person to the loaded data. Returns False if the id exists.
+    """
+    return apply_updates([("person", [person_id, name, birth])]) == 1
+
+
+def add_movie(movie_id, title, year):
+    """
+    Adds a movie to the loaded data. Returns False if the id exists.
+    """
+    return apply_updates([("movie", [movie_id, title, year])]) == 1
+
+
+def add_star(person_id, movie_id):
+    """
+    Records that a person starred in a movie. Returns False if either id
+    is unknown or the link already exists.
+    """
+    return apply_updates([("star", [person_id, movie_id])]) == 1
+
+
+def apply_delta(directory):
+    """
+    Applies delta people.csv, movies.csv and stars.csv files from
+    `directory` (any of which may be missing) to the loaded data,
+    in time proportional to the delta. Returns the number of changes.
+    """
+    records = []
+    for filename, kind, columns in [
+        ("people.csv", "person", ["id", "name", "birth"]),
+        ("movies.csv", "movie", ["id", "title", "year"]),
+        ("stars.csv", "star", ["person_id", "movie_id"])
+    ]:
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                records.append((kind, [row[column] for column in columns]))
+    return apply_updates(records)
+
+
+def apply_updates(records):
+    """
+    Applies (kind, values) update records to the loaded data and appends
+    the ones that changed something to the snapshot journal.
+    Returns the number of records applied.
+    """
+    global journal_length
+
+    applied = [record for record in records if apply_update(record)]
+    if applied and journal_path is not None:
+        if journal_id is None:
+            start_journal(applied)
+        else:
+            with open(journal_path, "a", encoding="utf-8") as f:
+                for kind, values in applied:
+                    f.write(json.dumps([kind, values]) + "\n")
+        journal_length += len(applied)
+    return len(applied)
+
+
+def start_journal(records):
+    """
+    Writes a new journal with a fresh id, keyed to the CSVs of the loaded
+    snapshot, holding `records`. The file is replaced atomically.
+    """
+    global journal_id
+
+    journal_id = os.urandom(8).hex()
+    tmp_path = f"{journal_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"journal": journal_id, "sources": journal_sources}) + "\n")
+        for kind, values in records:
+            f.write(json.dumps([kind, values]) + "\n")
+    os.replace(tmp_path, journal_path)
+
+
+def same_sources(recorded, sources):
+    """
+    Returns True if the `recorded` and `sources` stats describe CSV files
+    with the same contents.
+    """
+    try:
+        return all(
+            recorded[filename]["sha256"] == sources[filename]["sha256"]
+            for filename in SOURCE_FILES
+        )
+    except (KeyError, TypeError):
+        return False
+
+
+def apply_update(record):
+    """
+    Applies one ("person" | "movie" | "star", values) record to whichever
+    backend is loaded, keeping `names` and any landmark index in step.
+    Returns True if the record changed the data.
+    """
+    kind, values = record
+    if kind == "person":
+        person_id, name, birth = values
+        if person_id in people:
+            return False
+        if graph is None:
+            people[person_id] = {"name": name, "birth": birth, "movies": set()}
+        else:
+            graph.add_person(person_id, name, birth)
+            if landmarks is not None:
+                landmarks.add_person()
+        names.setdefault(name.lower(), set()).add(person_id)
+        if name_index is not None:
+            name_index.add(person_id, name)
+
+    elif kind == "movie":
+        movie_id, title, year = values
+        if movie_id in movies:
+            return False
+        if graph is None:
+            movies[movie_id] = {"title": title, "year": year, "stars": set()}
+        else:
+            graph.add_movie(movie_id, title, year)
+
+    elif kind == "star":
+        person_id, movie_id = values
+        if person_id not in people or movie_id not in movies:
+            return False
+        if graph is None:
+            if movie_id in people[person_id]["movies"]:
+                return False
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+        else:
+            p = graph.person_index[person_id]
+            m = graph.movie_index[movie_id]
+            if not graph.add_star(p, m):
+                return False
+            if landmarks is not None:
+                landmarks.add_star(graph, p, m)
+
+        # Film counts changed, so cached prefix rankings may have too
+        if name_index is not None:
+            name_index.top_prefixes.clear()
+
+    else:
+        raise ValueError(f"unknown update: {kind}")
+    return True
+
+
+def read_journal_header(path):
+    """
+    Returns the header of the journal at `path`, holding its id and the
+    source stats of the CSVs it extends, or None if there is no journal
+    or it has no header.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            header = json.loads(f.readline() or "null")
+    except (FileNotFoundError, ValueError):
+        return None
+    return header if isinstance(header, dict) else None
+
+
+def read_journal(path):
+    """
+    Yields (kind, values) records from the journal at `path`, if any.
+    """
+    try:
+        f = open(path, encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    continue
+                kind, values = record
+                yield kind, values
+
+
+def install_graph(new_graph):
+    """
+    Makes `new_graph` the loaded dataset, pointing `names`, `people` and
+    `movies` at views of the graph. Nothing is indexed until first used,
+    so installing a memory-mapped snapshot stays cheap.
+    """
+    global graph, names, people, movies, landmarks, name_index
+
+    graph = new_graph
+    landmarks = None
+    name_index = None
+    names = NamesView(graph)
+    people = PeopleView(graph)
+    movies = MoviesView(graph)
+
+
+def build_indexes():
+    """
+    Builds the lookup structures the csr backend otherwise creates on
+    first use, so that processes forked afterwards share them
+    copy-on-write instead of each building a private copy.
+    """
+    if graph is not None:
+        graph.person_index
+        graph.movie_index
+        names.lookup()
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    global search_algorithm
+
+    parser = argparse.ArgumentParser(description="Degrees of separation")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--backend", choices=["dict", "csr"], default="csr")
+    parser.add_argument("--no-snapshot", dest="snapshot", action="store_false",
+                        help="always parse the CSVs; don't read or write a snapshot")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer source/target pairs from a CSV or JSONL file "
+                             "('-' for stdin), printing one JSON result per line")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes for --batch")
+    parser.add_argument("--landmarks", type=int, default=0, metavar="K",
+                        help="load a K-landmark distance index (csr only)")
+    parser.add_argument("--search", choices=["bidirectional", "astar"],
+                        default="bidirectional",
+                        help="astar requires --landmarks")
+    parser.add_argument("--count", action="store_true",
+                        help="also report how many distinct shortest paths exist")
+    args = parser.parse_args()
+
+    if args.landmarks and args.backend != "csr":
+        sys.exit("--landmarks requires the csr backend")
+    if args.search == "astar" and not args.landmarks:
+        sys.exit("--search astar requires --landmarks")
+    search_algorithm = args.search
+
+    if args.batch is not None:
+        load_data(args.directory, backend=args.backend, snapshot=args.snapshot)
+        if args.landmarks:
+            load_landmarks(args.directory, args.landmarks)
+        if args.batch == "-":
+            run_batch(sys.stdin, sys.stdout, args.workers)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                run_batch(f, sys.stdout, args.workers)
+        return
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(args.directory, backend=args.backend, snapshot=args.snapshot)
+    if args.landmarks:
+        load_landmarks(args.directory, args.landmarks)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,13 +667,16 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = find_path(source, target)
 
     if path is None:
         print("Not connected.")
     else:
         degrees = len(path)
         print(f"{degrees} degrees of separation.")
+        if args.count:
+            _, count = count_shortest_paths(source, target)
+            print(f"{count} distinct shortest paths.")
         path = [(None, source)] + path
         for i in range(degrees):
             person1 = people[path[i][1]]["name"]
@@ -84,54 +685,297 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
+def run_batch(lines, out, workers=1):
+    """
+    Answers every source/target pair read from `lines` and writes one
+    JSON result per pair to `out`, in input order.
+
+    Queries are fanned out to forked worker processes, which share the
+    already loaded graph copy-on-write instead of loading it again.
+    """
+    pairs = read_pairs(lines)
+    if workers is None or workers <= 1 or \
+            "fork" not in multiprocessing.get_all_start_methods():
+        results = map(answer_query, pairs)
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+        return
+
+    build_indexes()
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        for result in pool.imap(answer_query, pairs, chunksize=16):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+
+
+def read_pairs(lines):
+    """
+    Yields (source, target) pairs from JSONL lines of the form
+    {"source": ..., "target": ...} or from two-column CSV rows.
+    A CSV header row of "source,target" is skipped.
+
+    A line that cannot be parsed yields a {"line": ..., "error": ...}
+    record in its place, so one bad line does not stop the batch.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                record = json.loads(line)
+                source, target = record["source"], record["target"]
+            except ValueError as e:
+                yield {"line": line, "error": f"invalid JSON: {e}"}
+                continue
+            except KeyError:
+                yield {"line": line, "error": "expected source and target"}
+                continue
+            if source is None or target is None:
+                yield {"line": line, "error": "expected source and target"}
+                continue
+            yield str(source), str(target)
+            continue
+        try:
+            row = next(csv.reader([line]))
+        except csv.Error as e:
+            yield {"line": line, "error": f"invalid CSV: {e}"}
+            continue
+        if len(row) != 2:
+            yield {"line": line, "error": "expected two columns"}
+            continue
+        if [value.strip().lower() for value in row] == ["source", "target"]:
+            continue
+        yield row[0].strip(), row[1].strip()
+
+
+def answer_query(pair):
+    """
+    Resolves a (source, target) pair of names or IDs and returns a
+    JSON-ready dictionary with the path, degrees and query latency.
+    Error records from `read_pairs` are passed through unchanged.
+    """
+    if isinstance(pair, dict):
+        return pair
+    source, target = pair
+    result = {"source": source, "target": target}
+    try:
+        source_id = resolve_person(source)
+        target_id = resolve_person(target)
+    except LookupError as e:
+        result["error"] = str(e)
+        return result
+
+    start = time.perf_counter()
+    path = find_path(source_id, target_id)
+    result["latency_ms"] = (time.perf_counter() - start) * 1000
+    result["source_id"] = source_id
+    result["target_id"] = target_id
+    if path is None:
+        result["degrees"] = None
+        result["path"] = None
+    else:
+        result["degrees"] = len(path)
+        result["path"] = [list(step) for step in path]
+    return result
+
+
+def resolve_person(value):
+    """
+    Returns the person_id for `value`, which may be an IMDB id or an
+    unambiguous name. Raises LookupError otherwise.
+    """
+    value = str(value)
+    if value in people:
+        return value
+    person_ids = names.get(value.lower(), set())
+    if len(person_ids) == 0:
+        raise LookupError(f"person not found: {value}")
+    if len(person_ids) > 1:
+        raise LookupError(f"ambiguous name: {value}")
+    return next(iter(person_ids))
+
+
 def shortest_path(source, target):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
-    """    
-    solution = list()
-    # Initialize frontier to just the starting position
-    start = (0,source)
-    start_node = Node(state=start, parent=None, action=None)
-    frontier = QueueFrontier()
-    frontier.add(start_node)
-    
-    # Initialize an empty explored set
-    nodes_explored = set()
-
-    # Keep looping until solution found
-    while True:
-        
-        # If nothing left in frontier, then no path
-        if frontier.empty():            
+    """
+    global search_stats
+
+    result = graph_search(
+        source, lambda person_id: person_id == target, neighbors_for_person
+    )
+    search_stats = result.stats
+    if not result.found:
+        return None
+    return list(zip(result.actions, result.states))
+
+
+def find_path(source, target):
+    """
+    Returns a shortest path between two person_ids using `search_algorithm`.
+
+    Bidirectional BFS is the default: on the small-world co-star graph the
+    landmark bounds are too loose for one-sided A* to beat two half-depth
+    searches, so landmarks are used there only to rule out unconnected pairs.
+    """
+    if search_algorithm == "astar" and landmarks is not None:
+        return goal_directed_path(source, target)
+    return bidirectional_shortest_path(source, target)
+
+
+def goal_directed_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, using A* guided by the
+    loaded landmark index.
+
+    If no possible path, returns None.
+    """
+    path = landmarks.shortest_path(
+        graph, graph.person_index[source], graph.person_index[target]
+    )
+    if path is None:
+        return None
+    return [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+
+
+def distance_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between two
+    person_ids from the loaded landmark index, or None if not connected.
+    `upper` is None when no landmark gives a finite bound.
+    """
+    return landmarks.bounds(
+        graph.person_index[source], graph.person_index[target]
+    )
+
+
+def count_shortest_paths(source, target):
+    """
+    Returns (degrees, count): the length of the shortest paths between two
+    person_ids and how many distinct shortest (movie_id, person_id) paths
+    there are, without building any of them. Returns (None, 0) if the
+    people are not connected.
+    """
+    dag = shortest_path_dag(source, target)
+    return dag.degrees, dag.count
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that connects
+    the source to the target, one at a time.
+    """
+    dag = shortest_path_dag(source, target)
+    if graph is None:
+        yield from dag.paths()
+        return
+    for path in dag.paths():
+        yield [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+
+
+def shortest_path_dag(source, target):
+    """
+    Returns the `ShortestPathDAG` between two person_ids
+    over whichever backend is loaded.
+    """
+    if graph is None:
+        return ShortestPathDAG(source, target, neighbors_for_person)
+    return ShortestPathDAG(
+        graph.person_index[source], graph.person_index[target], graph.neighbors
+    )
+
+
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching outward
+    from both people at once and always growing the smaller frontier.
+
+    If no possible path, returns None.
+    """
+    if graph is not None:
+        if landmarks is not None and not landmarks.connected(
+                graph.person_index[source], graph.person_index[target]):
             return None
-        
-        # Choose a node from the frontier
-        node = frontier.remove()        
-        
-        # If node is the goal, then we have a solution
-        if node.state[1] == target:            
-            
-            while node.parent is not None:
-                solution.append(node.state)
-                node = node.parent
-            
-            solution.reverse()                
-            return solution
-        
-        # Mark node as explored
-        nodes_explored.add(node.state)
-            
-        # Add neighbors to frontier
-        for current_state in neighbors_for_person(node.state[1]):
-            if not frontier.contains_state(current_state) and current_state not in nodes_explored and current_state[1] != source:
-                child = Node(state=current_state, parent=node, action=None)
-                frontier.add(child)
-            
-    # TODO
-    raise NotImplementedError
+        return graph.shortest_path(source, target)
+    if source == target:
+        return []
+
+    # Each side maps a reached person to (movie_id, person_id, depth),
+    # the link leading back towards that side's starting person
+    forward = {source: (None, None, 0)}
+    backward = {target: (None, None, 0)}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Expand one full layer of whichever side is cheaper to grow
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_layer(
+                forward_frontier, forward, backward
+            )
+        else:
+            backward_frontier, meeting = expand_layer(
+                backward_frontier, backward, forward
+            )
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(frontier, reached, other):
+    """
+    Expands every person in `frontier` by one hop, recording new people
+    in `reached`. Returns the next frontier and the person joining both
+    searches with the fewest total hops, or None if the sides never met.
+    """
+    next_frontier = []
+    meeting = None
+    best = None
+    for person_id in frontier:
+        depth = reached[person_id][2] + 1
+        for movie_id, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id in reached:
+                continue
+            reached[neighbor_id] = (movie_id, person_id, depth)
+            next_frontier.append(neighbor_id)
+
+            # Keep the meeting point that gives the shortest joined path
+            if neighbor_id in other:
+                total = depth + other[neighbor_id][2]
+                if best is None or total < best:
+                    best = total
+                    meeting = neighbor_id
+    return next_frontier, meeting
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Joins the forward and backward halves of a bidirectional search
+    that met at `meeting` into a list of (movie_id, person_id) pairs.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id][1] is not None:
+        movie_id, parent_id, _ = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id][1] is not None:
+        movie_id, next_id, _ = backward[person_id]
+        path.append((movie_id, next_id))
+        person_id = next_id
+    return path
 
 
 def person_id_for_name(name):
@@ -160,6 +1004,139 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def get_name_index():
+    """
+    Returns the name index for the loaded data, building it on first use.
+    """
+    global name_index
+
+    if name_index is None:
+        if graph is not None:
+            entries = zip(graph.person_ids, graph.person_names)
+        else:
+            entries = ((person_id, people[person_id]["name"]) for person_id in people)
+        name_index = NameIndex(entries)
+    return name_index
+
+
+def film_count(person_id):
+    """
+    Returns the number of movies a person starred in.
+    """
+    if graph is not None:
+        return graph.film_count(graph.person_index[person_id])
+    return len(people[person_id]["movies"])
+
+
+def search_names(query, limit=10, mode="auto", max_distance=1):
+    """
+    Returns up to `limit` ranked candidates for `query` as dictionaries of
+    person_id, name, birth, films, match and distance.
+
+    `mode` is "exact", "prefix", "token", "fuzzy" or "auto", which tries
+    each of them in that order until `limit` candidates are found.
+    Within a match kind, closer and more prolific people rank first.
+    """
+    index = get_name_index()
+    kinds = ["exact", "prefix", "token", "fuzzy"] if mode == "auto" else [mode]
+    found = {}
+    for kind in kinds:
+        if kind == "exact":
+            matches = [(person_id, 0) for person_id in names.get(query.lower(), ())]
+        elif kind == "prefix" and limit <= PREFIX_TOP:
+            matches = None
+            ranked = [
+                entry for entry in ranked_prefix(index, query)
+                if entry[2] not in found
+            ][:limit - len(found)]
+        elif kind == "prefix":
+            matches = [(person_id, 0) for person_id in index.prefix(query)]
+        elif kind == "token":
+            matches = [(person_id, 0) for person_id in index.tokens(query)]
+        elif kind == "fuzzy":
+            matches = index.fuzzy(query, max_distance)
+        else:
+            raise ValueError(f"unknown mode: {mode}")
+
+        # Rank every match, however many, before keeping the best
+        if matches is not None:
+            ranked = heapq.nsmallest(limit - len(found), (
+                (distance, -film_count(person_id), person_id)
+                for person_id, distance in matches if person_id not in found
+            ))
+        for distance, films, person_id in ranked:
+            person = people[person_id]
+            found[person_id] = {
+                "person_id": person_id,
+                "name": person["name"],
+                "birth": person["birth"],
+                "films": -films,
+                "match": kind,
+                "distance": distance
+            }
+        if len(found) >= limit:
+            break
+    return list(found.values())
+
+
+def ranked_prefix(index, prefix):
+    """
+    Returns the PREFIX_TOP most prolific people whose names start with
+    `prefix`, as search_names ranks them, ranking all the matches once
+    and then reusing the result until the data changes.
+    """
+    key = prefix.lower()
+    top = index.top_prefixes.get(key)
+    if top is None:
+        top = heapq.nsmallest(PREFIX_TOP, (
+            (0, -film_count(person_id), person_id) for person_id in index.prefix(key)
+        ))
+        if len(index.top_prefixes) >= PREFIX_CACHE_SIZE:
+            index.top_prefixes.clear()
+        index.top_prefixes[key] = top
+    return top
+
+
+def resolve_name(name, birth=None, fuzzy=False):
+    """
+    Returns a single person_id for `name` without prompting, or None.
+
+    Ambiguous names are narrowed to people born in `birth`, if given,
+    and then resolved to whoever starred in the most films. With `fuzzy`,
+    a name with no exact match falls back to the closest fuzzy match.
+    """
+    candidates = list(names.get(name.lower(), ()))
+    if not candidates and fuzzy:
+        matches = get_name_index().fuzzy(name)
+        if matches:
+            closest = min(distance for _, distance in matches)
+            candidates = [
+                person_id for person_id, distance in matches if distance == closest
+            ]
+    if birth is not None:
+        candidates = [
+            person_id for person_id in candidates
+            if people[person_id]["birth"] == str(birth)
+        ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda person_id: (film_count(person_id), person_id))
+
+
+def resolve_names(queries, birth=None, fuzzy=False):
+    """
+    Resolves many names at once; returns a list of person_ids (or None),
+    one per name in `queries`. Items may also be (name, birth) pairs.
+    """
+    resolved = []
+    for query in queries:
+        if isinstance(query, tuple):
+            resolved.append(resolve_name(query[0], query[1], fuzzy))
+        else:
+            resolved.append(resolve_name(query, birth, fuzzy))
+    return resolved
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
@@ -173,5 +1150,1011 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+class CoStarGraph():
+    """
+    Person <-> movie bipartite graph over dense integer indices.
+
+    Adjacency is stored in CSR form: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the stars
+    of movie `m` are `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`.
+    IMDB ids are only used at the edges, when translating queries and paths.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.mapping = None
+
+        # Stats of the CSVs the graph was built from, when known
+        self.sources = None
+
+        # People and movies beyond the CSR arrays, and links added since
+        # they were built, live in these overlays
+        self.base_people = len(person_offsets) - 1
+        self.base_movies = len(movie_offsets) - 1
+        self.extra_person_movies = {}
+        self.extra_movie_people = {}
+
+    @functools.cached_property
+    def person_index(self):
+        """
+        Maps person_ids to person indices, built on first use.
+        """
+        return {person_id: i for i, person_id in enumerate(self.person_ids)}
+
+    @functools.cached_property
+    def movie_index(self):
+        """
+        Maps movie_ids to movie indices, built on first use.
+        """
+        return {movie_id: i for i, movie_id in enumerate(self.movie_ids)}
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Builds a graph straight from the CSV files in `directory`,
+        without creating per-record dictionaries or sets.
+        """
+        person_ids, person_names, person_births = [], [], []
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            id_col = header.index("id")
+            name_col = header.index("name")
+            birth_col = header.index("birth")
+            for row in reader:
+                person_ids.append(row[id_col])
+                person_names.append(row[name_col])
+                person_births.append(row[birth_col])
+
+        movie_ids, movie_titles, movie_years = [], [], []
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            id_col = header.index("id")
+            title_col = header.index("title")
+            year_col = header.index("year")
+            for row in reader:
+                movie_ids.append(row[id_col])
+                movie_titles.append(row[title_col])
+                movie_years.append(row[year_col])
+
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        pairs = []
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            person_col = header.index("person_id")
+            movie_col = header.index("movie_id")
+            for row in reader:
+                p = person_index.get(row[person_col])
+                m = movie_index.get(row[movie_col])
+                if p is not None and m is not None:
+                    pairs.append((p, m))
+
+        return cls.from_pairs(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years, pairs
+        )
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Builds a graph from `people` and `movies` dictionaries
+        in the format filled by `load_data`.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        pairs = [
+            (person_index[person_id], movie_index[movie_id])
+            for person_id in person_ids
+            for movie_id in people[person_id]["movies"]
+        ]
+        return cls.from_pairs(
+            person_ids,
+            [people[person_id]["name"] for person_id in person_ids],
+            [people[person_id]["birth"] for person_id in person_ids],
+            movie_ids,
+            [movies[movie_id]["title"] for movie_id in movie_ids],
+            [movies[movie_id]["year"] for movie_id in movie_ids],
+            pairs
+        )
+
+    @classmethod
+    def from_pairs(cls, person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years, pairs):
+        """
+        Builds a graph from metadata lists and (person, movie) index pairs.
+        Duplicate pairs are dropped, as the set-based backend does.
+        """
+        # Sorting packed integer keys is much cheaper than sorting tuples
+        people_count = len(person_ids)
+        movies_count = len(movie_ids)
+        keys = sorted({p * movies_count + m for p, m in pairs})
+        person_offsets, person_movies = csr_from_keys(people_count, movies_count, keys)
+        keys = sorted([
+            (key % movies_count) * people_count + key // movies_count for key in keys
+        ])
+        movie_offsets, movie_people = csr_from_keys(movies_count, people_count, keys)
+        return cls(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            person_offsets, person_movies, movie_offsets, movie_people
+        )
+
+    def film_count(self, p):
+        """
+        Returns the number of movies person `p` starred in, without
+        building the list of them.
+        """
+        count = len(self.extra_person_movies.get(p, ()))
+        if p < self.base_people:
+            count += self.person_offsets[p + 1] - self.person_offsets[p]
+        return count
+
+    def movies_of(self, p):
+        """
+        Returns the movie indices person `p` starred in.
+        """
+        if p < self.base_people:
+            movies = self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+        else:
+            movies = ()
+        extra = self.extra_person_movies.get(p)
+        return movies if extra is None else list(movies) + extra
+
+    def stars_of(self, m):
+        """
+        Returns the person indices who starred in movie `m`.
+        """
+        if m < self.base_movies:
+            stars = self.movie_people[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+        else:
+            stars = ()
+        extra = self.extra_movie_people.get(m)
+        return stars if extra is None else list(stars) + extra
+
+    def add_person(self, person_id, name, birth):
+        """
+        Appends a person and returns its index.
+        """
+        p = len(self.person_ids)
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        self.person_index[person_id] = p
+        return p
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Appends a movie and returns its index.
+        """
+        m = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        self.movie_index[movie_id] = m
+        return m
+
+    def add_star(self, p, m):
+        """
+        Links person `p` to movie `m` in the overlay.
+        Returns False if the link already exists.
+        """
+        if m in self.movies_of(p):
+            return False
+        self.extra_person_movies.setdefault(p, []).append(m)
+        self.extra_movie_people.setdefault(m, []).append(p)
+        return True
+
+    def neighbors(self, p):
+        """
+        Yields (movie, person) index pairs for people who starred with `p`.
+        """
+        for m in self.movies_of(p):
+            for q in self.stars_of(m):
+                yield m, q
+
+    def distances_from(self, source):
+        """
+        Returns a bytearray of BFS distances from person index `source`
+        to every person, capped at UNREACHED - 1; unreachable people
+        are marked UNREACHED.
+        """
+        movies_of = self.movies_of
+        stars_of = self.stars_of
+
+        distances = bytearray([UNREACHED]) * len(self.person_ids)
+        seen_movies = bytearray(len(self.movie_ids))
+        distances[source] = 0
+        frontier = [source]
+        depth = 0
+        while frontier:
+            depth = min(depth + 1, UNREACHED - 1)
+            next_frontier = []
+            for p in frontier:
+                for m in movies_of(p):
+                    if seen_movies[m]:
+                        continue
+                    seen_movies[m] = 1
+                    for q in stars_of(m):
+                        if distances[q] == UNREACHED:
+                            distances[q] = depth
+                            next_frontier.append(q)
+            frontier = next_frontier
+        return distances
+
+    def components(self):
+        """
+        Returns an int array labelling every person index with the
+        id of its connected component.
+        """
+        movies_of = self.movies_of
+        stars_of = self.stars_of
+
+        labels = array("i", [-1]) * len(self.person_ids)
+        seen_movies = bytearray(len(self.movie_ids))
+        component = 0
+        for start in range(len(self.person_ids)):
+            if labels[start] != -1:
+                continue
+            labels[start] = component
+            stack = [start]
+            while stack:
+                p = stack.pop()
+                for m in movies_of(p):
+                    if seen_movies[m]:
+                        continue
+                    seen_movies[m] = 1
+                    for q in stars_of(m):
+                        if labels[q] == -1:
+                            labels[q] = component
+                            stack.append(q)
+            component += 1
+        return labels
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, as IMDB ids.
+
+        If no possible path, returns None.
+        """
+        path = self.index_path(
+            self.person_index[source], self.person_index[target]
+        )
+        if path is None:
+            return None
+        return [(self.movie_ids[m], self.person_ids[p]) for m, p in path]
+
+    def index_path(self, source, target):
+        """
+        Bidirectional BFS between person indices `source` and `target`.
+        Returns a list of (movie, person) index pairs, or None.
+        """
+        if source == target:
+            return []
+
+        # Each side maps a reached person to (movie, parent, depth) and
+        # remembers which movies it has already expanded, since a movie's
+        # whole cast is reached the first time it is seen
+        forward = {source: (-1, -1, 0)}
+        backward = {target: (-1, -1, 0)}
+        forward_movies = set()
+        backward_movies = set()
+        forward_frontier = [source]
+        backward_frontier = [target]
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting = self.expand_layer(
+                    forward_frontier, forward, forward_movies, backward
+                )
+            else:
+                backward_frontier, meeting = self.expand_layer(
+                    backward_frontier, backward, backward_movies, forward
+                )
+
+            if meeting is not None:
+                path = []
+                p = meeting
+                while forward[p][1] != -1:
+                    m, parent, _ = forward[p]
+                    path.append((m, p))
+                    p = parent
+                path.reverse()
+                p = meeting
+                while backward[p][1] != -1:
+                    m, following, _ = backward[p]
+                    path.append((m, following))
+                    p = following
+                return path
+
+        return None
+
+    def expand_layer(self, frontier, reached, seen_movies, other):
+        """
+        Expands one BFS layer of person indices, skipping movies this side
+        has already expanded. Returns the next frontier and the best
+        meeting person with the other side, or None.
+        """
+        movies_of = self.movies_of
+        stars_of = self.stars_of
+
+        next_frontier = []
+        meeting = None
+        best = None
+        for p in frontier:
+            depth = reached[p][2] + 1
+            for m in movies_of(p):
+                if m in seen_movies:
+                    continue
+                seen_movies.add(m)
+                for q in stars_of(m):
+                    if q in reached:
+                        continue
+                    reached[q] = (m, p, depth)
+                    next_frontier.append(q)
+                    if q in other:
+                        total = depth + other[q][2]
+                        if best is None or total < best:
+                            best = total
+                            meeting = q
+        return next_frontier, meeting
+
+
+def csr_from_keys(rows, columns, keys):
+    """
+    Returns (offsets, indices) int arrays for sorted `keys`,
+    each encoding the entry (row, column) as row * columns + column.
+    """
+    offsets = array("i", bytes(4 * (rows + 1)))
+    indices = array("i", [key % columns for key in keys])
+    for key in keys:
+        offsets[key // columns + 1] += 1
+    for row in range(rows):
+        offsets[row + 1] += offsets[row]
+    return offsets, indices
+
+
+class NamesView(MutableMapping):
+    """
+    `names`-style mapping of lowercased names to sets of person_ids over
+    a `CoStarGraph`, built from the graph's names on first lookup.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.index = None
+
+    def lookup(self):
+        if self.index is None:
+            self.index = {}
+            for person_id, name in zip(self.graph.person_ids, self.graph.person_names):
+                key = name.lower()
+                if key not in self.index:
+                    self.index[key] = {person_id}
+                else:
+                    self.index[key].add(person_id)
+        return self.index
+
+    def __getitem__(self, name):
+        return self.lookup()[name]
+
+    def __setitem__(self, name, person_ids):
+        self.lookup()[name] = person_ids
+
+    def __delitem__(self, name):
+        del self.lookup()[name]
+
+    def __iter__(self):
+        return iter(self.lookup())
+
+    def __len__(self):
+        return len(self.lookup())
+
+    def __contains__(self, name):
+        return name in self.lookup()
+
+    def get(self, name, default=None):
+        return self.lookup().get(name, default)
+
+
+class PeopleView(Mapping):
+    """
+    Read-only `people`-style mapping over a `CoStarGraph`. Each lookup
+    builds the usual {name, birth, movies} dictionary on demand.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        p = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[p],
+            "birth": graph.person_births[p],
+            "movies": {graph.movie_ids[m] for m in graph.movies_of(p)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+
+class MoviesView(Mapping):
+    """
+    Read-only `movies`-style mapping over a `CoStarGraph`. Each lookup
+    builds the usual {title, year, stars} dictionary on demand.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        m = graph.movie_index[movie_id]
+        return {
+            "title": graph.movie_titles[m],
+            "year": graph.movie_years[m],
+            "stars": {graph.person_ids[p] for p in graph.stars_of(m)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+
+class LandmarkIndex():
+    """
+    ALT index over a `CoStarGraph`: BFS distances (in degrees) from K
+    high-degree landmark people to every person, one byte per person,
+    plus a connected-component label for every person.
+    """
+
+    def __init__(self, landmarks, distances, components):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.components = components
+        self.mapping = None
+
+        # Id of the journal and number of its records reflected in the
+        # index, and component labels merged by later updates
+        # (label -> surviving label)
+        self.journal = 0
+        self.journal_id = None
+        self.merged = {}
+        self.next_label = None
+
+    @classmethod
+    def build(cls, graph, k=16):
+        """
+        Picks the `k` people with the most co-star links as landmarks
+        and runs a BFS from each of them.
+        """
+        people_count = len(graph.person_ids)
+        cast_sizes = [len(graph.stars_of(m)) for m in range(len(graph.movie_ids))]
+
+        def degree(p):
+            return sum(cast_sizes[m] - 1 for m in graph.movies_of(p))
+
+        chosen = heapq.nlargest(min(k, people_count), range(people_count), key=degree)
+        distances = [graph.distances_from(p) for p in chosen]
+        return cls(chosen, distances, graph.components())
+
+    def save(self, path, sources):
+        """
+        Writes the index to `path`: magic, version, a JSON header keyed to
+        the CSV `sources`, the int component labels and then one row of
+        byte distances per landmark. The file is replaced atomically.
+        """
+        header = json.dumps({
+            "byteorder": sys.byteorder,
+            "itemsize": array("i").itemsize,
+            "people": len(self.components),
+            "landmarks": list(self.landmarks),
+            "journal": self.journal,
+            "journal_id": self.journal_id,
+            "sources": sources
+        }).encode("utf-8")
+        header += b" " * (-(len(LANDMARK_MAGIC) + 8 + len(header)) % 8)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(LANDMARK_MAGIC)
+            f.write(struct.pack("<II", LANDMARK_VERSION, len(header)))
+            f.write(header)
+            f.write(array("i", [
+                self.component(p) for p in range(len(self.components))
+            ]).tobytes())
+            for row in self.distances:
+                f.write(row)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, directory):
+        """
+        Memory-maps the index at `path`. Returns None if it is missing,
+        of another version, or no longer matches the CSVs in `directory`.
+        """
+        try:
+            with open(path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        parsed = read_header(mapping, LANDMARK_MAGIC, LANDMARK_VERSION)
+        if parsed is None:
+            return None
+        header, start = parsed
+
+        try:
+            current, touched = check_sources(header["sources"], directory)
+            if not current:
+                return None
+            view = memoryview(mapping)
+            people_count = header["people"]
+            end = start + people_count * array("i").itemsize
+            if end + len(header["landmarks"]) * people_count > len(mapping):
+                return None
+            components = view[start:end].cast("i")
+            distances = []
+            for _ in header["landmarks"]:
+                distances.append(view[end:end + people_count])
+                end += people_count
+            index = cls(header["landmarks"], distances, components)
+            index.journal = header["journal"]
+            index.journal_id = header.get("journal_id")
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        if touched:
+            rewrite_header(path, LANDMARK_MAGIC, header, start)
+        index.mapping = mapping
+        return index
+
+    def component(self, p):
+        """
+        Returns the current component label of person index `p`.
+        """
+        label = self.components[p]
+        while label in self.merged:
+            label = self.merged[label]
+        return label
+
+    def connected(self, source, target):
+        """
+        Returns True if person indices `source` and `target`
+        are in the same connected component.
+        """
+        return self.component(source) == self.component(target)
+
+    def make_writable(self):
+        """
+        Copies memory-mapped rows into private arrays before the first update.
+        """
+        if isinstance(self.components, memoryview):
+            self.components = array("i", self.components)
+            self.distances = [bytearray(row) for row in self.distances]
+
+    def add_person(self):
+        """
+        Extends the index with a new, not yet linked person.
+        """
+        self.make_writable()
+        if self.next_label is None:
+            self.next_label = max(self.components, default=-1) + 1
+        for row in self.distances:
+            row.append(UNREACHED)
+        self.components.append(self.next_label)
+        self.next_label += 1
+
+    def add_star(self, graph, p, m):
+        """
+        Updates the index after person `p` was linked to movie `m` in `graph`.
+        Only distances that shrink are touched: each change is pushed
+        outwards from the movie's cast until no neighbor improves.
+        """
+        self.make_writable()
+        cast = graph.stars_of(m)
+
+        # The movie's whole cast now shares one component
+        root = self.component(p)
+        for q in cast:
+            label = self.component(q)
+            if label != root:
+                self.merged[label] = root
+
+        for row in self.distances:
+            best = min(row[q] for q in cast)
+            if best == UNREACHED:
+                continue
+            d = min(best + 1, UNREACHED - 1)
+            queue = deque()
+            for q in cast:
+                if row[q] > d:
+                    row[q] = d
+                    queue.append(q)
+            while queue:
+                u = queue.popleft()
+                d = min(row[u] + 1, UNREACHED - 1)
+                for movie in graph.movies_of(u):
+                    for v in graph.stars_of(movie):
+                        if row[v] > d:
+                            row[v] = d
+                            queue.append(v)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the distance between person
+        indices `source` and `target`, or None if they are not connected.
+        """
+        if not self.connected(source, target):
+            return None
+        if source == target:
+            return 0, 0
+        lower = 1
+        upper = None
+        for row in self.distances:
+            a = row[source]
+            b = row[target]
+            if a == UNREACHED or b == UNREACHED:
+                continue
+            lower = max(lower, abs(a - b))
+            if a < UNREACHED - 1 and b < UNREACHED - 1:
+                if upper is None or a + b < upper:
+                    upper = a + b
+        return lower, upper
+
+    def shortest_path(self, graph, source, target):
+        """
+        A* between person indices `source` and `target`, using the
+        landmark lower bound as heuristic. Returns a list of
+        (movie, person) index pairs, or None.
+        """
+        if not self.connected(source, target):
+            return None
+        if source == target:
+            return []
+
+        # Landmarks that reach the target; the rest give no information
+        rows = [
+            (row, row[target]) for row in self.distances
+            if row[target] != UNREACHED
+        ]
+
+        def heuristic(p):
+            best = 0
+            for row, d in rows:
+                diff = abs(row[p] - d)
+                if diff > best:
+                    best = diff
+            return best
+
+        movies_of = graph.movies_of
+        stars_of = graph.stars_of
+
+        # Cost so far and (movie, parent) link of every reached person;
+        # a movie is only re-expanded if reached again more cheaply
+        cost = {source: 0}
+        parents = {source: (-1, -1)}
+        movie_cost = {}
+        closed = set()
+        frontier = [(heuristic(source), 0, source)]
+
+        while frontier:
+            _, g, p = heapq.heappop(frontier)
+            g = -g
+            if p in closed:
+                continue
+            if p == target:
+                path = []
+                while parents[p][1] != -1:
+                    m, parent = parents[p]
+                    path.append((m, p))
+                    p = parent
+                path.reverse()
+                return path
+            closed.add(p)
+
+            for m in movies_of(p):
+                if movie_cost.get(m, g + 1) <= g:
+                    continue
+                movie_cost[m] = g
+                for q in stars_of(m):
+                    if q in closed or cost.get(q, g + 2) <= g + 1:
+                        continue
+                    cost[q] = g + 1
+                    parents[q] = (m, p)
+                    heapq.heappush(frontier, (g + 1 + heuristic(q), -(g + 1), q))
+
+        return None
+
+
+class ShortestPathDAG():
+    """
+    BFS layers from `source` up to the layer containing `target`, with the
+    number of shortest paths reaching each person (counted by dynamic
+    programming as each layer is expanded).
+
+    Only distances and counts are stored; the shortest-path DAG edges are
+    recovered on demand by `paths`, which walks back from the target.
+    `neighbors(person)` must yield (movie, person) pairs.
+    """
+
+    def __init__(self, source, target, neighbors):
+        self.source = source
+        self.target = target
+        self.neighbors = neighbors
+        self.distance = {source: 0}
+        self.counts = {source: 1}
+
+        frontier = [source]
+        while frontier and target not in self.distance:
+            depth = self.distance[frontier[0]] + 1
+            next_frontier = []
+            for person in frontier:
+                count = self.counts[person]
+                for _, neighbor in neighbors(person):
+                    seen = self.distance.get(neighbor)
+                    if seen is None:
+                        self.distance[neighbor] = depth
+                        self.counts[neighbor] = count
+                        next_frontier.append(neighbor)
+                    elif seen == depth:
+                        self.counts[neighbor] += count
+            frontier = next_frontier
+
+    @property
+    def degrees(self):
+        """
+        Length of the shortest paths, or None if not connected.
+        """
+        return self.distance.get(self.target)
+
+    @property
+    def count(self):
+        """
+        Number of distinct shortest paths from source to target.
+        """
+        return self.counts.get(self.target, 0)
+
+    def paths(self):
+        """
+        Yields each shortest path as a list of (movie, person) pairs,
+        walking back from the target through people one layer closer
+        to the source. Only the path being built is held in memory.
+        """
+        if self.target not in self.distance:
+            return
+        if self.target == self.source:
+            yield []
+            return
+        suffix = []
+        stack = [self.predecessors(self.target)]
+        people_on_path = [self.target]
+        while stack:
+            step = next(stack[-1], None)
+            if step is None:
+                stack.pop()
+                people_on_path.pop()
+                if suffix:
+                    suffix.pop()
+                continue
+            movie, previous = step
+            suffix.append((movie, people_on_path[-1]))
+            if previous == self.source:
+                yield suffix[::-1]
+                suffix.pop()
+                continue
+            people_on_path.append(previous)
+            stack.append(self.predecessors(previous))
+
+    def predecessors(self, person):
+        """
+        Yields (movie, neighbor) pairs for neighbors one layer closer
+        to the source, i.e. the incoming shortest-path DAG edges.
+        """
+        depth = self.distance[person] - 1
+        for movie, neighbor in self.neighbors(person):
+            if self.distance.get(neighbor) == depth:
+                yield movie, neighbor
+
+
+class NameIndex():
+    """
+    Lookup structures over lowercased person names: a sorted list for
+    prefix search, token postings for word search, and a deletion
+    neighbourhood over tokens for bounded edit-distance search.
+    """
+
+    def __init__(self, entries):
+        self.person_ids = []
+        self.keys = []
+        self.postings = {}
+        self.deletes = {}
+        self.deletes_distance = 0
+
+        # Ranked candidates per prefix, filled by `ranked_prefix`
+        self.top_prefixes = {}
+
+        # Sort all names once; inserting them one at a time is quadratic
+        for person_id, name in entries:
+            i = len(self.person_ids)
+            key = name.lower()
+            self.person_ids.append(person_id)
+            self.keys.append((key, i))
+            self.add_tokens(key, i)
+        self.keys.sort()
+
+    def add(self, person_id, name):
+        """
+        Adds a person's name to every structure built so far.
+        """
+        i = len(self.person_ids)
+        key = name.lower()
+        self.person_ids.append(person_id)
+        bisect.insort(self.keys, (key, i))
+        self.add_tokens(key, i)
+        self.top_prefixes.clear()
+
+    def add_tokens(self, key, i):
+        """
+        Adds the words of the name `key` of person `i` to the postings
+        and, for words not seen before, to the deletion neighbourhood.
+        """
+        for token in set(key.split()):
+            if token not in self.postings:
+                self.postings[token] = []
+                for variant in deletes_of(token, self.deletes_distance):
+                    self.deletes.setdefault(variant, []).append(token)
+            self.postings[token].append(i)
+
+    def prefix(self, prefix):
+        """
+        Returns the person_ids of every name starting with `prefix`, in
+        alphabetical order of name. An empty prefix matches no one.
+        """
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+
+        # Names starting with the prefix sort between it and the prefix
+        # followed by the highest code point
+        start = bisect.bisect_left(self.keys, (prefix,))
+        end = bisect.bisect_left(self.keys, (prefix + "\U0010ffff",), start)
+        return [self.person_ids[i] for _, i in self.keys[start:end]]
+
+    def tokens(self, query):
+        """
+        Returns person_ids whose names contain every word in `query`.
+        """
+        lists = [self.postings.get(token, []) for token in set(query.lower().split())]
+        if not lists:
+            return []
+        lists.sort(key=len)
+        matches = set(lists[0])
+        for postings in lists[1:]:
+            matches.intersection_update(postings)
+            if not matches:
+                break
+        return [self.person_ids[i] for i in sorted(matches)]
+
+    def similar_tokens(self, token, max_distance):
+        """
+        Returns {indexed token: edit distance} for tokens within
+        `max_distance` edits of `token`.
+        """
+        self.build_deletes(max_distance)
+        found = {}
+        for variant in deletes_of(token, max_distance):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate not in found:
+                    distance = edit_distance(token, candidate, max_distance)
+                    if distance <= max_distance:
+                        found[candidate] = distance
+        return found
+
+    def build_deletes(self, max_distance):
+        """
+        Extends the deletion neighbourhood of the indexed words to cover
+        `max_distance` edits, if it does not already.
+        """
+        if max_distance > self.deletes_distance:
+            self.deletes = {}
+            for indexed in self.postings:
+                for variant in deletes_of(indexed, max_distance):
+                    self.deletes.setdefault(variant, []).append(indexed)
+            self.deletes_distance = max_distance
+
+    def fuzzy(self, query, max_distance=1):
+        """
+        Returns (person_id, distance) pairs for names where every word in
+        `query` is within `max_distance` edits of some word in the name.
+        `distance` is the total number of edits.
+        """
+        best = None
+        for token in set(query.lower().split()):
+            distances = {}
+            for candidate, distance in self.similar_tokens(token, max_distance).items():
+                for i in self.postings[candidate]:
+                    if distance < distances.get(i, max_distance + 1):
+                        distances[i] = distance
+            if best is None:
+                best = distances
+            else:
+                best = {
+                    i: best[i] + distance
+                    for i, distance in distances.items() if i in best
+                }
+            if not best:
+                return []
+        if best is None:
+            return []
+        return [(self.person_ids[i], distance) for i, distance in best.items()]
+
+
+def deletes_of(word, max_distance):
+    """
+    Returns the set of strings formed by deleting up to `max_distance`
+    characters from `word`, including `word` itself.
+    """
+    result = {word}
+    layer = {word}
+    for _ in range(max_distance):
+        layer = {
+            variant[:i] + variant[i + 1:]
+            for variant in layer for i in range(len(variant))
+        }
+        result |= layer
+    return result
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the Levenshtein distance between `a` and `b`,
+    or `limit + 1` as soon as it is known to exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,291 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import degrees
+
+from degrees_server import latency_summary
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael",
+    "Linda", "William", "Elizabeth", "David", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen", "Daniel",
+    "Nancy", "Matthew", "Lisa", "Anthony", "Betty", "Mark", "Margaret",
+    "Donald", "Sandra", "Steven", "Ashley", "Paul", "Kimberly", "Andrew",
+    "Emily", "Joshua", "Donna", "Kenneth", "Michelle", "Kevin", "Carol"
+]
+
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
+    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark",
+    "Ramirez", "Lewis", "Robinson", "Walker", "Young", "Allen", "King",
+    "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores", "Green"
+]
+
+TITLE_WORDS = [
+    "Night", "Return", "Last", "City", "Love", "Dark", "Star", "River",
+    "Secret", "Blood", "King", "Summer", "Lost", "Road", "Shadow", "Game",
+    "House", "Fire", "Dream", "War", "Ghost", "Heart", "Storm", "Silent"
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degrees dataset generator and benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="write a synthetic dataset")
+    generate_parser.add_argument("directory")
+    generate_parser.add_argument("--people", type=int, default=100000)
+    generate_parser.add_argument("--movies", type=int, default=30000)
+    generate_parser.add_argument("--stars", type=int, default=300000,
+                                 help="approximate number of star rows")
+    generate_parser.add_argument("--alpha", type=float, default=2.0,
+                                 help="power-law exponent of cast sizes")
+    generate_parser.add_argument("--max-cast", type=int, default=500)
+    generate_parser.add_argument("--skew", type=float, default=2.0,
+                                 help="how strongly casting favours prolific people")
+    generate_parser.add_argument("--seed", type=int, default=0)
+
+    run_parser = commands.add_parser("run", help="benchmark load_data and searches")
+    run_parser.add_argument("directory")
+    run_parser.add_argument("--backend", choices=["dict", "csr"], default="csr")
+    run_parser.add_argument("--no-snapshot", dest="snapshot", action="store_false")
+    run_parser.add_argument("--search", choices=["bfs", "bidirectional", "astar"],
+                            default="bidirectional")
+    run_parser.add_argument("--landmarks", type=int, default=16,
+                            help="landmarks for --search astar")
+    run_parser.add_argument("--queries", type=int, default=1000)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", metavar="FILE", help="write results as JSON")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="relative slowdown reported as a regression")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        counts = generate(
+            args.directory, args.people, args.movies, args.stars,
+            alpha=args.alpha, max_cast=args.max_cast, skew=args.skew, seed=args.seed
+        )
+        print(json.dumps(counts))
+    elif args.command == "run":
+        results = run(
+            args.directory, backend=args.backend, snapshot=args.snapshot,
+            search=args.search, landmarks=args.landmarks,
+            queries=args.queries, seed=args.seed
+        )
+        print(json.dumps(results, indent=2))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.candidate) as f:
+            candidate = json.load(f)
+        regressions = compare(baseline, candidate, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+def generate(directory, people, movies, stars, alpha=2.0, max_cast=500,
+             skew=2.0, seed=0):
+    """
+    Writes people.csv, movies.csv and stars.csv to `directory`.
+
+    Cast sizes follow a Pareto distribution with exponent `alpha`, scaled
+    so the expected total is about `stars` rows and capped at `max_cast`.
+    Casting picks person `int(people * random() ** skew)`, so a few people
+    appear in many movies, as character actors do. Rows are streamed to
+    disk, so memory use does not grow with the dataset.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(people):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            if rng.random() < 0.3:
+                name += f" {rng.choice(LAST_NAMES)}"
+            birth = str(rng.randint(1900, 2005)) if rng.random() < 0.8 else ""
+            writer.writerow([str(i + 1), name, birth])
+
+    with open(os.path.join(directory, "movies.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for i in range(movies):
+            title = " ".join(rng.sample(TITLE_WORDS, rng.randint(1, 3)))
+            writer.writerow([str(movie_id(i)), title, str(rng.randint(1920, 2020))])
+
+    # Pareto scale parameter giving a mean cast of stars / movies
+    mean_cast = max(1.0, stars / max(1, movies))
+    scale = mean_cast * (alpha - 1) / alpha if alpha > 1 else mean_cast
+    rows = 0
+    with open(os.path.join(directory, "stars.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for i in range(movies):
+            size = min(max_cast, people, max(1, int(scale * rng.paretovariate(alpha))))
+            cast = set()
+            while len(cast) < size:
+                cast.add(int(people * rng.random() ** skew))
+            for person in cast:
+                writer.writerow([str(person + 1), str(movie_id(i))])
+            rows += len(cast)
+
+    return {"people": people, "movies": movies, "stars": rows}
+
+
+def movie_id(i):
+    """
+    Returns the IMDB-style numeric id of the `i`th generated movie.
+    """
+    return 1000000 + i
+
+
+def run(directory, backend="csr", snapshot=True, search="bidirectional",
+        landmarks=16, queries=1000, seed=0):
+    """
+    Loads `directory`, then times `queries` seeded random source/target
+    searches. Returns a JSON-ready dictionary of load time, peak RSS and
+    latency percentiles.
+
+    `snapshot_hit` records whether the load memory-mapped an existing
+    snapshot or parsed the CSVs (and wrote a snapshot), since the two
+    differ by orders of magnitude in time and memory.
+    """
+    path = os.path.join(directory, degrees.SNAPSHOT_FILE)
+    before = snapshot_stamp(path)
+    start = time.perf_counter()
+    degrees.load_data(directory, backend=backend, snapshot=snapshot)
+    load_time = time.perf_counter() - start
+    load_rss = peak_rss_mb()
+    # A rebuilt snapshot is renamed into place, so its stamp changes
+    snapshot_hit = (backend == "csr" and snapshot and before is not None
+                    and before == snapshot_stamp(path))
+
+    index_time = None
+    if search == "astar":
+        start = time.perf_counter()
+        degrees.load_landmarks(directory, landmarks)
+        index_time = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    pairs = [(rng.choice(person_ids), rng.choice(person_ids)) for _ in range(queries)]
+    if search == "bfs":
+        find = degrees.shortest_path
+    elif search == "astar":
+        find = degrees.goal_directed_path
+    else:
+        find = degrees.bidirectional_shortest_path
+
+    latencies = []
+    connected = 0
+    total_degrees = 0
+    for source, target in pairs:
+        start = time.perf_counter()
+        path = find(source, target)
+        latencies.append(time.perf_counter() - start)
+        if path is not None:
+            connected += 1
+            total_degrees += len(path)
+
+    return {
+        "config": {
+            "directory": directory,
+            "backend": backend,
+            "snapshot": snapshot,
+            "search": search,
+            "landmarks": landmarks if search == "astar" else None,
+            "queries": queries,
+            "seed": seed
+        },
+        "python": platform.python_version(),
+        "people": len(degrees.people),
+        "movies": len(degrees.movies),
+        "snapshot_hit": snapshot_hit,
+        "load_s": load_time,
+        "index_s": index_time,
+        "load_peak_rss_mb": load_rss,
+        "peak_rss_mb": peak_rss_mb(),
+        "connected": connected,
+        "mean_degrees": total_degrees / connected if connected else None,
+        "latency_ms": latency_summary(latencies)
+    }
+
+
+def snapshot_stamp(path):
+    """
+    Returns the inode and modification time of the file at `path`,
+    or None when it does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns)
+
+
+def peak_rss_mb():
+    """
+    Returns this process's peak resident set size in MiB,
+    or None where the resource module is unavailable.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    if sys.platform == "darwin":
+        return peak / (1 << 20)
+    return peak / 1024
+
+
+def compare(baseline, candidate, threshold=0.10):
+    """
+    Prints load time, memory and latency of two result dictionaries
+    side by side. Returns the metrics that grew by more than `threshold`.
+
+    Load time and memory are skipped when one run loaded a snapshot and
+    the other parsed the CSVs, as they are not comparable.
+    """
+    metrics = [
+        ("p50_ms", baseline["latency_ms"]["p50"], candidate["latency_ms"]["p50"]),
+        ("p99_ms", baseline["latency_ms"]["p99"], candidate["latency_ms"]["p99"])
+    ]
+    if baseline.get("snapshot_hit") == candidate.get("snapshot_hit"):
+        metrics[:0] = [
+            ("load_s", baseline["load_s"], candidate["load_s"]),
+            ("peak_rss_mb", baseline["peak_rss_mb"], candidate["peak_rss_mb"])
+        ]
+    else:
+        print("load_s and peak_rss_mb skipped: only one run loaded a snapshot")
+    regressions = []
+    for name, old, new in metrics:
+        if old is None or new is None:
+            continue
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:>12}: {old:10.3f} -> {new:10.3f} ({change:+.1%}){flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    main()
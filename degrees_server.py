@@ -0,0 +1,314 @@
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import multiprocessing
+import signal
+import time
+
+from collections import OrderedDict, deque
+from urllib.parse import parse_qs, urlsplit
+
+import degrees
+
+# Number of recent request latencies kept per endpoint for percentiles
+LATENCY_WINDOW = 10000
+
+# Largest fuzzy edit distance /person accepts; each step up multiplies
+# the size of the name index's deletion neighbourhood
+MAX_DISTANCE = 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degrees of separation server")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--socket", metavar="PATH",
+                        help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for searches")
+    parser.add_argument("--cache-size", type=int, default=4096,
+                        help="number of (source, target) answers to keep")
+    parser.add_argument("--landmarks", type=int, default=0, metavar="K",
+                        help="load a K-landmark index to rule out unconnected pairs")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory, backend="csr")
+    if args.landmarks:
+        degrees.load_landmarks(args.directory, args.landmarks)
+
+    # /person lookups run on the event loop, so build the name index now
+    # rather than stalling every request behind the first lookup
+    degrees.get_name_index().build_deletes(1)
+
+    # Forked search workers then share the id lookups copy-on-write
+    degrees.build_indexes()
+    print("Data loaded.")
+
+    pool = make_pool(args.directory, args.landmarks, args.workers)
+    server = DegreesServer(pool, cache_size=args.cache_size)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.socket))
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def make_pool(directory, landmarks, workers=None):
+    """
+    Returns a process pool for searches. Forked workers share the graph
+    already loaded in this process; otherwise each worker loads its own.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return concurrent.futures.ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("fork")
+        )
+    return concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=load_worker, initargs=(directory, landmarks)
+    )
+
+
+def load_worker(directory, landmarks):
+    """
+    Loads the dataset in a freshly spawned worker process.
+    """
+    degrees.load_data(directory, backend="csr")
+    if landmarks:
+        degrees.load_landmarks(directory, landmarks)
+
+
+class LRUCache():
+    """
+    Least-recently-used cache of query answers, counting hits and misses.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Returns (True, value) if `key` is cached, otherwise (False, None).
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, self.entries[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "capacity": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class Metrics():
+    """
+    Per-endpoint request counts and latencies, with percentiles
+    over the most recent LATENCY_WINDOW requests.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.errors = {}
+        self.latencies = {}
+
+    def record(self, endpoint, latency, error=False):
+        self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+        if error:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+        window = self.latencies.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW))
+        window.append(latency)
+
+    def stats(self):
+        result = {}
+        for endpoint, count in self.counts.items():
+            result[endpoint] = {
+                "requests": count,
+                "errors": self.errors.get(endpoint, 0),
+                "latency_ms": latency_summary(self.latencies[endpoint])
+            }
+        return result
+
+
+def latency_summary(latencies):
+    """
+    Returns the mean, median, 99th percentile and maximum of
+    `latencies`, given in seconds, in milliseconds.
+    """
+    ordered = sorted(latencies)
+    return {
+        "mean": sum(ordered) / len(ordered) * 1000 if ordered else None,
+        "p50": percentile(ordered, 0.50) * 1000,
+        "p99": percentile(ordered, 0.99) * 1000,
+        "max": ordered[-1] * 1000 if ordered else None
+    }
+
+
+def percentile(ordered, fraction):
+    """
+    Returns the nearest-rank percentile of an already sorted list.
+    """
+    if not ordered:
+        return 0.0
+    rank = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[rank]
+
+
+class DegreesServer():
+    """
+    Minimal asyncio HTTP/1.1 JSON server over the loaded `degrees` data.
+
+    Endpoints:
+        GET /path?source=...&target=...   shortest path by name or id
+        GET /person?name=...              ranked candidates for a name
+                                          (optional mode, limit, distance)
+        GET /metrics                      latency and cache statistics
+    """
+
+    def __init__(self, pool, cache_size=4096):
+        self.pool = pool
+        self.cache = LRUCache(cache_size)
+        self.metrics = Metrics()
+        self.started = time.time()
+
+    async def serve(self, host, port, socket_path=None):
+        if socket_path is not None:
+            server = await asyncio.start_unix_server(self.handle, path=socket_path)
+            print(f"Listening on {socket_path}")
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            print(f"Listening on http://{host}:{port}")
+
+        # Stop cleanly on SIGINT/SIGTERM so the worker pool is shut down
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except NotImplementedError:
+                pass
+        async with server:
+            await stop.wait()
+
+    async def handle(self, reader, writer):
+        """
+        Serves a single request on a connection, then closes it.
+        """
+        try:
+            request_line = await reader.readline()
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2:
+                status, body = 400, {"error": "bad request"}
+            elif parts[0] != "GET":
+                status, body = 405, {"error": "method not allowed"}
+            else:
+                status, body = await self.dispatch(parts[1])
+        except Exception as e:
+            status, body = 500, {"error": str(e)}
+
+        payload = json.dumps(body).encode("utf-8")
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found",
+                   405: "Method Not Allowed", 500: "Internal Server Error"}
+        writer.write(
+            f"HTTP/1.1 {status} {reasons[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + payload
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def dispatch(self, target):
+        url = urlsplit(target)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        start = time.perf_counter()
+        if url.path == "/path":
+            status, body = await self.path(query)
+        elif url.path == "/person":
+            status, body = self.person(query)
+        elif url.path == "/metrics":
+            return 200, self.stats()
+        else:
+            return 404, {"error": f"unknown endpoint: {url.path}"}
+        self.metrics.record(url.path, time.perf_counter() - start, status != 200)
+        return status, body
+
+    async def path(self, query):
+        if "source" not in query or "target" not in query:
+            return 400, {"error": "source and target are required"}
+        try:
+            source_id = degrees.resolve_person(query["source"])
+            target_id = degrees.resolve_person(query["target"])
+        except LookupError as e:
+            return 400, {"error": str(e)}
+
+        hit, path = self.cache.get((source_id, target_id))
+        if not hit:
+            loop = asyncio.get_running_loop()
+            path = await loop.run_in_executor(
+                self.pool, degrees.find_path, source_id, target_id
+            )
+            self.cache.put((source_id, target_id), path)
+
+        return 200, {
+            "source_id": source_id,
+            "target_id": target_id,
+            "degrees": None if path is None else len(path),
+            "path": None if path is None else [list(step) for step in path],
+            "cached": hit
+        }
+
+    def person(self, query):
+        if "name" not in query:
+            return 400, {"error": "name is required"}
+        try:
+            distance = int(query.get("distance", 1))
+            if not 0 <= distance <= MAX_DISTANCE:
+                raise ValueError(f"distance must be between 0 and {MAX_DISTANCE}")
+            candidates = degrees.search_names(
+                query["name"],
+                limit=int(query.get("limit", 10)),
+                mode=query.get("mode", "exact"),
+                max_distance=distance
+            )
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        return 200, {"name": query["name"], "candidates": candidates}
+
+    def stats(self):
+        return {
+            "uptime_s": time.time() - self.started,
+            "cache": self.cache.stats(),
+            "endpoints": self.metrics.stats()
+        }
+
+
+if __name__ == "__main__":
+    main()
@@ -1,103 +1,123 @@
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
 import sys
+import time
 
-class Node():
-    def __init__(self, state, parent, action):
-        self.state = state
-        self.parent = parent
-        self.action = action
+from array import array
 
+from search import ALGORITHMS as SEARCH_ALGORITHMS, SearchResult, SearchStats, graph_search
+from util import NodeArena, PriorityFrontier
 
-class StackFrontier():
-    def __init__(self):
-        self.frontier = []
+ALGORITHMS = SEARCH_ALGORITHMS + ["jps", "wavefront", "field"]
 
-    def add(self, node):
-        self.frontier.append(node)
+# Row and column offset of each move
+STEPS = {
+    "up": (-1, 0),
+    "down": (1, 0),
+    "left": (0, -1),
+    "right": (0, 1)
+}
+ACTIONS = {step: action for action, step in STEPS.items()}
+MOVES = list(STEPS)
 
-    def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+# A run of open cells in a row of walls
+OPEN_RUN = re.compile(b"\x00+")
 
-    def empty(self):
-        return len(self.frontier) == 0
+# Goal field files, and the step code of cells with no move towards the goal
+FIELD_MAGIC = b"MAZEFLD\0"
+FIELD_VERSION = 1
+NO_STEP = 255
 
-    def remove(self):
-        if self.empty():
-            raise Exception("empty frontier")
-        else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
-            return node
+# Maps each byte of a maze file to 1 for a wall or 0 for an open cell
+WALL_TABLE = bytes(0 if byte in b" AB" else 1 for byte in range(256))
 
+# Maps a row of walls back to text, with "#" standing in for "█"
+TEXT_TABLE = bytes.maketrans(b"\x00\x01", b" #")
 
-class QueueFrontier(StackFrontier):
+# Image colours, indexed by the cell kinds below
+EMPTY, WALL, START, GOAL, SOLUTION, EXPLORED = range(6)
+PALETTE = [
+    (237, 240, 252, 255),
+    (40, 40, 40, 255),
+    (255, 0, 0, 255),
+    (0, 171, 28, 255),
+    (220, 235, 113, 255),
+    (212, 97, 85, 255)
+]
 
-    def remove(self):
-        if self.empty():
-            raise Exception("empty frontier")
-        else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
-            return node
 
 class Maze():
 
     def __init__(self, filename):
 
-        # Read file and set height and width of maze
-        with open(filename) as f:
-            contents = f.read()
+        # Parse the file one line at a time, keeping each row of the grid
+        # as a bytearray of 1 for walls and 0 for open cells
+        self.walls = []
+        self.width = 0
+        starts = 0
+        goals = 0
+        with open(filename, "rb") as f:
+            for i, line in enumerate(f):
+                line = line.rstrip(b"\r\n")
+                if not line.isascii():
+                    # Every non-ASCII character is a wall; keep one byte per character
+                    line = line.decode("utf-8", errors="replace").encode("ascii", errors="replace")
+
+                # Find start and goal
+                if b"A" in line:
+                    starts += line.count(b"A")
+                    self.start = (i, line.index(b"A"))
+                if b"B" in line:
+                    goals += line.count(b"B")
+                    self.goal = (i, line.index(b"B"))
+
+                self.walls.append(bytearray(line.translate(WALL_TABLE)))
+                self.width = max(self.width, len(line))
 
         # Validate start and goal
-        if contents.count("A") != 1:
+        if starts != 1:
             raise Exception("maze must have exactly one start point")
-        if contents.count("B") != 1:
+        if goals != 1:
             raise Exception("maze must have exactly one goal")
 
-        # Determine height and width of maze
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
-
-        # Keep track of walls
-        self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
+        # Pad short rows with open cells
+        self.height = len(self.walls)
+        for row in self.walls:
+            if len(row) < self.width:
+                row.extend(bytes(self.width - len(row)))
 
         self.solution = None
+        self.field = None
 
 
     def print(self):
         solution = self.solution[1] if self.solution is not None else None
-        print()
+
+        # Characters to overlay on the walls, grouped by row
+        marks = {}
+        if solution is not None:
+            for i, j in solution:
+                marks.setdefault(i, {})[j] = "*"
+        marks.setdefault(self.goal[0], {})[self.goal[1]] = "B"
+        marks.setdefault(self.start[0], {})[self.start[1]] = "A"
+
+        lines = []
         for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")
-                elif (i, j) == self.start:
-                    print("A", end="")
-                elif (i, j) == self.goal:
-                    print("B", end="")
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")
-                else:
-                    print(" ", end="")
-            print()
-        print()
+            line = row.translate(TEXT_TABLE).decode("ascii")
+            if i in marks:
+                chars = list(line)
+                for j, char in marks[i].items():
+                    if not row[j]:
+                        chars[j] = char
+                line = "".join(chars)
+            lines.append(line.replace("#", "█"))
+        print("\n" + "\n".join(lines) + "\n")
 
 
     def neighbors(self, state):
@@ -116,58 +136,371 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def is_open(self, row, col):
+        return 0 <= row < self.height and 0 <= col < self.width and not self.walls[row][col]
 
-        # Keep track of number of states explored
-        self.num_explored = 0
 
-        # Initialize frontier to just the starting position
-        start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
-        frontier.add(start)
+    def solve(self, algorithm="dfs"):
+        """Finds a solution to maze, if one exists."""
 
-        # Initialize an empty explored set
-        self.explored = set()
+        if algorithm == "jps":
+            result = self.jump_point_search()
+        elif algorithm == "wavefront":
+            result = self.wavefront_search()
+        elif algorithm == "field":
+            result = self.field_search()
+        else:
+            result = graph_search(
+                self.start,
+                lambda state: state == self.goal,
+                self.neighbors,
+                algorithm=algorithm,
+                heuristic=self.manhattan
+            )
 
-        # Keep looping until solution found
+        # Keep track of number of states explored
+        self.stats = result.stats
+        self.num_explored = result.stats.nodes_expanded
+        self.explored = result.explored
+
+        if not result.found:
+            raise Exception("no solution")
+        self.solution = (result.actions, result.states)
+
+
+    def bitmap(self):
+        """
+        Returns the maze as a NumPy bool array, True for open cells.
+        """
+        import numpy as np
+        walls = np.frombuffer(b"".join(self.walls), dtype=np.uint8)
+        return walls.reshape(self.height, self.width) == 0
+
+
+    def wavefront_search(self):
+        """
+        Breadth-first search expanding a whole layer at a time with NumPy
+        array operations, for very large mazes.
+
+        The grid is cropped to the bounding box of its open cells and given
+        a one-cell wall border, so each layer's neighbours are found by
+        adding fixed offsets to the flat indices of the wavefront. Distances
+        from the start are kept in an int32 field, and the path is recovered
+        by stepping back from the goal one distance at a time.
+        """
+        import numpy as np
+        stats = SearchStats("wavefront")
+        start_time = time.perf_counter()
+        try:
+            grid = self.bitmap()
+            rows = np.flatnonzero(grid.any(axis=1))
+            cols = np.flatnonzero(grid.any(axis=0))
+            top, left = int(rows[0]) - 1, int(cols[0]) - 1
+            grid = np.pad(grid[top + 1:int(rows[-1]) + 1, left + 1:int(cols[-1]) + 1], 1)
+            width = grid.shape[1]
+            grid = grid.ravel()
+            distance = np.full(grid.shape, -1, dtype=np.int32)
+
+            start = (self.start[0] - top) * width + self.start[1] - left
+            goal = (self.goal[0] - top) * width + self.goal[1] - left
+            offsets = {action: dr * width + dc for action, (dr, dc) in STEPS.items()}
+            steps = np.array(list(offsets.values()))
+            distance[start] = 0
+
+            frontier = np.array([start])
+            layer = 0
+            while distance[goal] < 0 and len(frontier):
+                stats.nodes_expanded += len(frontier)
+                reached = (frontier[:, None] + steps).ravel()
+                reached = np.unique(reached[grid[reached] & (distance[reached] < 0)])
+                layer += 1
+                distance[reached] = layer
+                frontier = reached
+                if len(frontier) > stats.peak_frontier:
+                    stats.peak_frontier = len(frontier)
+
+            explored = GridMask((distance >= 0).reshape(-1, width), (top, left))
+            if distance[goal] < 0:
+                return SearchResult(None, None, None, explored, stats)
+
+            # Walk back from the goal through cells one step closer to the start
+            stats.nodes_expanded += 1
+            actions = []
+            states = []
+            cell = goal
+            for step in range(int(distance[goal]), 0, -1):
+                for action, offset in offsets.items():
+                    if distance[cell - offset] == step - 1:
+                        break
+                actions.append(action)
+                states.append((cell // width + top, cell % width + left))
+                cell -= offset
+            actions.reverse()
+            states.reverse()
+            return SearchResult(actions, states, len(states), explored, stats)
+        finally:
+            stats.wall_time = time.perf_counter() - start_time
+
+
+    def goal_field(self, path=None):
+        """
+        Returns the `GoalField` of this maze. It is read from `path` if that
+        holds the field of this exact maze; otherwise it is built and, given
+        `path`, saved there for next time.
+        """
+        if self.field is None:
+            if path is not None:
+                self.field = GoalField.load(path, self)
+            if self.field is None:
+                self.field = GoalField.build(self)
+                if path is not None:
+                    self.field.save(path)
+        return self.field
+
+
+    def field_search(self):
+        """
+        Answers from the goal field, building it first if needed.
+        """
+        stats = SearchStats("field")
+        start_time = time.perf_counter()
+        try:
+            path = self.goal_field().path(self.start)
+            if path is None:
+                return SearchResult(None, None, None, set(), stats)
+            actions, states = path
+            stats.nodes_expanded = len(states) + 1
+            return SearchResult(actions, states, len(states), set(states), stats)
+        finally:
+            stats.wall_time = time.perf_counter() - start_time
+
+
+    def connected(self):
+        """
+        Returns whether the goal can be reached from the start, without
+        searching. Each row is split into runs of open cells, and runs in
+        neighbouring rows that overlap are merged with a union-find, so the
+        work grows with the number of runs rather than of cells.
+        """
+        parents = []
+
+        def find(run):
+            while parents[run] != run:
+                parents[run] = parents[parents[run]]
+                run = parents[run]
+            return run
+
+        # Open runs of every row as lists of starts, ends and run ids
+        rows = []
+        previous = None
+        for walls in self.walls:
+            starts = []
+            ends = []
+            ids = []
+            for match in OPEN_RUN.finditer(walls):
+                starts.append(match.start())
+                ends.append(match.end())
+                ids.append(len(parents))
+                parents.append(len(parents))
+
+            # Merge with every overlapping run of the row above
+            if previous is not None:
+                above_starts, above_ends, above_ids = previous
+                i = j = 0
+                while i < len(starts) and j < len(above_starts):
+                    if starts[i] < above_ends[j] and above_starts[j] < ends[i]:
+                        a, b = find(ids[i]), find(above_ids[j])
+                        if a != b:
+                            parents[a] = b
+                    if ends[i] < above_ends[j]:
+                        i += 1
+                    else:
+                        j += 1
+            previous = (starts, ends, ids)
+            rows.append(previous)
+
+        def run_of(state):
+            starts, _, ids = rows[state[0]]
+            return find(ids[bisect.bisect_right(starts, state[1]) - 1])
+
+        return run_of(self.start) == run_of(self.goal)
+
+
+    def manhattan(self, state):
+        """Manhattan distance from `state` to the goal."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+
+    def jump_point_search(self):
+        """
+        A* over jump points, for this uniform-cost 4-connected grid.
+
+        Straight runs are crossed without queueing the cells along them;
+        only the cells where a jump stops are expanded and counted as
+        explored. The full path is filled back in between jump points.
+        """
+        stats = SearchStats("jps")
+        start_time = time.perf_counter()
+        try:
+            nodes = NodeArena()
+            state_of = nodes.states.__getitem__
+            frontier = PriorityFrontier(state_of)
+            frontier.add(nodes.add(self.start, None, None), self.manhattan(self.start))
+            best = {self.start: 0}
+            explored = set()
+
+            while not frontier.empty():
+                node = frontier.remove()
+                stats.nodes_expanded += 1
+                current = state_of(node)
+                g = best[current]
+
+                if current == self.goal:
+                    actions, states = self.fill_path(nodes.path(node)[1])
+                    return SearchResult(actions, states, g, explored, stats)
+
+                explored.add(current)
+                for action in self.jump_actions(nodes.action(node)):
+                    point = self.jump(current, STEPS[action])
+                    if point is None or point in explored:
+                        continue
+                    cost = g + abs(point[0] - current[0]) + abs(point[1] - current[1])
+                    if cost < best.get(point, float("inf")):
+                        best[point] = cost
+                        frontier.add(nodes.add(point, node, action), cost + self.manhattan(point))
+                if len(frontier) > stats.peak_frontier:
+                    stats.peak_frontier = len(frontier)
+
+            return SearchResult(None, None, None, explored, stats)
+        finally:
+            stats.wall_time = time.perf_counter() - start_time
+
+
+    def jump_actions(self, action):
+        """
+        Directions worth jumping in from a jump point reached by `action`:
+        straight on and both ways across. Nothing is pruned at the start.
+        """
+        if action is None:
+            return list(STEPS)
+        if action in ("left", "right"):
+            return [action, "up", "down"]
+        return [action, "left", "right"]
+
+
+    def jump(self, state, step):
+        """
+        Moves from `state` by `step` until reaching a jump point, which is
+        returned, or a wall, in which case None is returned.
+
+        A horizontal jump stops beside an opening above or below that was
+        walled off one cell back. A vertical jump stops likewise, and also
+        wherever a horizontal jump from the cell would find a jump point.
+        """
+        dr, dc = step
+        row, col = state
         while True:
-
-            # If nothing left in frontier, then no path
-            if frontier.empty():
-                raise Exception("no solution")
-
-            # Choose a node from the frontier
-            node = frontier.remove()
-            self.num_explored += 1
-
-            # If node is the goal, then we have a solution
-            if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
-                return
-
-            # Mark node as explored
-            self.explored.add(node.state)
-
-            # Add neighbors to frontier
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
-
-
-    def output_image(self, filename, show_solution=True, show_explored=False):
+            row += dr
+            col += dc
+            if not self.is_open(row, col):
+                return None
+            if (row, col) == self.goal:
+                return (row, col)
+
+            if dr == 0:
+                if (self.is_open(row - 1, col) and not self.is_open(row - 1, col - dc)) or \
+                        (self.is_open(row + 1, col) and not self.is_open(row + 1, col - dc)):
+                    return (row, col)
+            else:
+                if (self.is_open(row, col - 1) and not self.is_open(row - dr, col - 1)) or \
+                        (self.is_open(row, col + 1) and not self.is_open(row - dr, col + 1)):
+                    return (row, col)
+                if self.jump((row, col), (0, -1)) is not None or \
+                        self.jump((row, col), (0, 1)) is not None:
+                    return (row, col)
+
+
+    def fill_path(self, points):
+        """
+        Expands the jump points on a path from the start into single steps,
+        returning (actions, states).
+        """
+        actions = []
+        states = []
+        row, col = self.start
+        for target_row, target_col in points:
+            dr = (target_row > row) - (target_row < row)
+            dc = (target_col > col) - (target_col < col)
+            while (row, col) != (target_row, target_col):
+                row += dr
+                col += dc
+                actions.append(ACTIONS[(dr, dc)])
+                states.append((row, col))
+        return actions, states
+
+
+    def cell_mask(self, cells):
+        """
+        Returns a NumPy bool array marking `cells`, either
+        an iterable of (row, col) states or a `GridMask`.
+        """
+        import numpy as np
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        if isinstance(cells, GridMask):
+            top, left = cells.origin
+            height, width = cells.mask.shape
+            r0, c0 = max(top, 0), max(left, 0)
+            r1, c1 = min(top + height, self.height), min(left + width, self.width)
+            mask[r0:r1, c0:c1] = cells.mask[r0 - top:r1 - top, c0 - left:c1 - left]
+        else:
+            cells = list(cells)
+            if cells:
+                rows, cols = zip(*cells)
+                mask[list(rows), list(cols)] = True
+        return mask
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, cell_border=2):
+        try:
+            import numpy as np
+        except ImportError:
+            return self.draw_image(
+                filename, show_solution, show_explored, cell_size, cell_border
+            )
+        from PIL import Image
+
+        # Colour index of every cell, painted from lowest to highest precedence
+        index = np.full((self.height, self.width), EMPTY, dtype=np.uint8)
+        if self.solution is not None:
+            if show_explored:
+                index[self.cell_mask(self.explored)] = EXPLORED
+            if show_solution:
+                index[self.cell_mask(self.solution[1])] = SOLUTION
+        index[self.goal] = GOAL
+        index[self.start] = START
+        index[~self.bitmap()] = WALL
+
+        # Scale each cell up to a cell_size square, then black out its border:
+        # `border` pixels on the top and left, one fewer on the bottom and right
+        pixels = np.array(PALETTE, dtype=np.uint8)[index]
+        pixels = np.repeat(np.repeat(pixels, cell_size, axis=0), cell_size, axis=1)
+        border = min(cell_border, (cell_size - 1) // 2)
+        if border:
+            offset = np.arange(cell_size)
+            edge = (offset < border) | (offset > cell_size - border)
+            pixels[np.tile(edge, self.height)] = (0, 0, 0, 255)
+            pixels[:, np.tile(edge, self.width)] = (0, 0, 0, 255)
+
+        Image.fromarray(pixels, "RGBA").save(filename)
+
+    def draw_image(self, filename, show_solution=True, show_explored=False,
+                   cell_size=50, cell_border=2):
+        """
+        Draws the same image as `output_image` one cell at a time with
+        PIL alone, for when NumPy is not installed.
+        """
         from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
 
         # Create a blank canvas
         img = Image.new(
@@ -177,53 +510,278 @@ class Maze():
         )
         draw = ImageDraw.Draw(img)
 
-        solution = self.solution[1] if self.solution is not None else None
+        border = min(cell_border, (cell_size - 1) // 2)
+        solution = set(self.solution[1]) if self.solution is not None else set()
         for i, row in enumerate(self.walls):
             for j, col in enumerate(row):
-
-                # Walls
                 if col:
-                    fill = (40, 40, 40)
-
-                # Start
+                    kind = WALL
                 elif (i, j) == self.start:
-                    fill = (255, 0, 0)
-
-                # Goal
+                    kind = START
                 elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
-
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
-
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
-
-                # Empty cell
+                    kind = GOAL
+                elif show_solution and (i, j) in solution:
+                    kind = SOLUTION
+                elif self.solution is not None and show_explored and \
+                        (i, j) in self.explored:
+                    kind = EXPLORED
                 else:
-                    fill = (237, 240, 252)
-
-                # Draw cell
+                    kind = EMPTY
                 draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
+                    ([(j * cell_size + border, i * cell_size + border),
+                      ((j + 1) * cell_size - border, (i + 1) * cell_size - border)]),
+                    fill=PALETTE[kind]
                 )
 
         img.save(filename)
 
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
+class GoalField():
+    """
+    Distance to the goal and first move towards it for every cell of a
+    maze, from one breadth-first search rooted at the goal.
+
+    `distance` holds an int per cell (-1 if the goal is unreachable) and
+    `steps` a byte per cell indexing MOVES (NO_STEP at the goal and at
+    unreachable cells), both in row-major order. Any start is then
+    answered by following `steps`, in time proportional to its path.
+    """
+
+    def __init__(self, height, width, goal, digest, distance, steps):
+        self.height = height
+        self.width = width
+        self.goal = goal
+        self.digest = digest
+        self.distance = distance
+        self.steps = steps
+        self.mapping = None
+
+    @classmethod
+    def build(cls, maze):
+        """
+        Runs the breadth-first search from the goal a whole layer at a time
+        with NumPy, over the grid padded with a one-cell wall border.
+        """
+        import numpy as np
+        height, width = maze.height, maze.width
+        padded_width = width + 2
+        grid = np.pad(maze.bitmap(), 1).ravel()
+        distance = np.full(grid.shape, -1, dtype=np.int32)
+        steps = np.full(grid.shape, NO_STEP, dtype=np.uint8)
+
+        # A neighbour gets back to the cell it was reached from by the opposite move
+        neighbors = [
+            (-padded_width, MOVES.index("down")),
+            (padded_width, MOVES.index("up")),
+            (-1, MOVES.index("right")),
+            (1, MOVES.index("left"))
+        ]
 
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+        goal = (maze.goal[0] + 1) * padded_width + maze.goal[1] + 1
+        distance[goal] = 0
+        frontier = np.array([goal])
+        layer = 0
+        while len(frontier):
+            layer += 1
+            reached = []
+            for offset, code in neighbors:
+                cells = frontier + offset
+                cells = cells[grid[cells] & (distance[cells] < 0)]
+                distance[cells] = layer
+                steps[cells] = code
+                reached.append(cells)
+            frontier = np.concatenate(reached)
+
+        # Drop the border and keep plain arrays, which index faster than NumPy's
+        distance = distance.reshape(height + 2, padded_width)[1:-1, 1:-1]
+        steps = steps.reshape(height + 2, padded_width)[1:-1, 1:-1]
+        distance = array("i", np.ascontiguousarray(distance).tobytes())
+        steps = bytearray(np.ascontiguousarray(steps).tobytes())
+        return cls(height, width, maze.goal, maze_digest(maze), distance, steps)
+
+    def save(self, path):
+        """
+        Writes the field to `path`: magic, version, a JSON header, then the
+        distance and step arrays. The file is replaced atomically.
+        """
+        distance = self.distance.tobytes() if isinstance(self.distance, array) \
+            else bytes(self.distance)
+        header = json.dumps({
+            "byteorder": sys.byteorder,
+            "itemsize": array("i").itemsize,
+            "height": self.height,
+            "width": self.width,
+            "goal": list(self.goal),
+            "digest": self.digest
+        }).encode("utf-8")
+        header += b" " * (-(len(FIELD_MAGIC) + 8 + len(header)) % 8)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(FIELD_MAGIC)
+            f.write(struct.pack("<II", FIELD_VERSION, len(header)))
+            f.write(header)
+            f.write(distance)
+            f.write(self.steps)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, maze):
+        """
+        Memory-maps the field saved at `path`. Returns None if there is
+        no usable field there or it was built for a different maze.
+        """
+        try:
+            with open(path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        # A truncated or damaged file is treated as missing
+        prefix = len(FIELD_MAGIC) + 8
+        if len(mapping) < prefix or mapping[:len(FIELD_MAGIC)] != FIELD_MAGIC:
+            return None
+        version, header_length = struct.unpack("<II", mapping[len(FIELD_MAGIC):prefix])
+        if version != FIELD_VERSION:
+            return None
+        try:
+            header = json.loads(mapping[prefix:prefix + header_length])
+            if header["byteorder"] != sys.byteorder or \
+                    header["itemsize"] != array("i").itemsize:
+                return None
+            if (header["height"], header["width"], tuple(header["goal"])) != \
+                    (maze.height, maze.width, maze.goal) or \
+                    header["digest"] != maze_digest(maze):
+                return None
+        except (ValueError, KeyError, TypeError):
+            return None
+
+        cells = maze.height * maze.width
+        start = prefix + header_length
+        if len(mapping) < start + cells * (header["itemsize"] + 1):
+            return None
+        view = memoryview(mapping)
+        distance = view[start:start + cells * header["itemsize"]].cast("i")
+        start += cells * header["itemsize"]
+        field = cls(
+            maze.height, maze.width, maze.goal, header["digest"],
+            distance, view[start:start + cells]
+        )
+        field.mapping = mapping
+        return field
+
+    def distance_from(self, state):
+        """
+        Returns the number of steps from `state` to the goal, or None.
+        """
+        distance = self.distance[self.index(state)]
+        return None if distance < 0 else distance
+
+    def path(self, start):
+        """
+        Returns the (actions, states) of a shortest path from `start`
+        to the goal, or None if the goal cannot be reached from it.
+        """
+        cell = self.index(start)
+        if self.distance[cell] < 0:
+            return None
+        actions = []
+        states = []
+        row, col = start
+        while self.steps[cell] != NO_STEP:
+            action = MOVES[self.steps[cell]]
+            dr, dc = STEPS[action]
+            row += dr
+            col += dc
+            cell = row * self.width + col
+            actions.append(action)
+            states.append((row, col))
+        return actions, states
+
+    def index(self, state):
+        row, col = state
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            raise ValueError(f"{state} is outside the maze")
+        return row * self.width + col
+
+
+def maze_digest(maze):
+    """
+    Returns a digest of the walls of `maze`, to tell whether
+    a saved goal field still belongs to it.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for row in maze.walls:
+        digest.update(row)
+    return digest.hexdigest()
+
+
+class GridMask():
+    """
+    Set-like view of the cells of a maze marked True in a boolean NumPy
+    array whose [0, 0] element is maze cell `origin`.
+    """
+
+    def __init__(self, mask, origin=(0, 0)):
+        self.mask = mask
+        self.origin = origin
+
+    def __contains__(self, state):
+        row = state[0] - self.origin[0]
+        col = state[1] - self.origin[1]
+        height, width = self.mask.shape
+        return 0 <= row < height and 0 <= col < width and bool(self.mask[row, col])
+
+    def __iter__(self):
+        import numpy as np
+        for row, col in zip(*np.nonzero(self.mask)):
+            yield (int(row) + self.origin[0], int(col) + self.origin[1])
+
+    def __len__(self):
+        return int(self.mask.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a maze")
+    parser.add_argument("maze")
+    parser.add_argument("--algo", choices=ALGORITHMS, default="dfs")
+    parser.add_argument("--cell-size", type=int, default=50,
+                        help="pixels per cell in maze.png")
+    parser.add_argument("--field", metavar="FILE",
+                        help="read or save the goal distance field used by "
+                             "--algo field and --start")
+    parser.add_argument("--start", action="append", metavar="ROW,COL",
+                        help="only report the shortest path length from this "
+                             "start, using the goal field; may be repeated")
+    args = parser.parse_args()
+
+    m = Maze(args.maze)
+    if args.start:
+        start_time = time.perf_counter()
+        field = m.goal_field(args.field)
+        print(f"Goal field ready in {(time.perf_counter() - start_time) * 1000:.2f} ms")
+        for start in args.start:
+            row, col = (int(value) for value in start.split(","))
+            distance = field.distance_from((row, col))
+            if distance is None:
+                print(f"{row},{col}: no solution")
+            else:
+                print(f"{row},{col}: {distance} steps")
+        return
+
+    if args.field is not None:
+        m.goal_field(args.field)
+
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(args.algo)
+    print("States Explored:", m.num_explored)
+    print(f"Time: {m.stats.wall_time * 1000:.2f} ms")
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True, cell_size=args.cell_size)
+
+
+if __name__ == "__main__":
+    main()
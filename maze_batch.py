@@ -0,0 +1,145 @@
+import argparse
+import functools
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import maze
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve many maze files in parallel")
+    parser.add_argument("patterns", nargs="+", metavar="PATTERN",
+                        help="maze files or glob patterns, e.g. 'mazes/*.txt'")
+    parser.add_argument("--algo", choices=maze.ALGORITHMS, default="bfs")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", metavar="DIR",
+                        help="directory for the per-file JSON results "
+                             "(default: next to each maze)")
+    args = parser.parse_args()
+
+    paths = []
+    for pattern in args.patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            print(f"{pattern}: no such file", file=sys.stderr)
+        paths.extend(matches)
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        sys.exit("No mazes to solve.")
+
+    start = time.perf_counter()
+    counts = {"solved": 0, "no solution": 0, "error": 0}
+    for result in solve_files(paths, args.algo, args.output, args.workers):
+        if "error" in result:
+            counts["error"] += 1
+            print(f"{result['maze']}: error: {result['error']}")
+        elif result["solvable"]:
+            counts["solved"] += 1
+        else:
+            counts["no solution"] += 1
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths)} mazes in {elapsed:.2f}s: "
+          f"{counts['solved']} solved, {counts['no solution']} with no solution, "
+          f"{counts['error']} errors")
+
+
+def solve_files(paths, algorithm="bfs", output=None, workers=None):
+    """
+    Solves every maze in `paths` across a process pool, writing each
+    result as JSON, and yields the results in the order they finish.
+    """
+    jobs = list(zip(paths, result_paths(paths, output)))
+    solve = functools.partial(solve_job, algorithm=algorithm)
+    if workers is not None and workers <= 1:
+        yield from map(solve, jobs)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(solve, jobs, chunksize=4)
+
+
+def result_paths(paths, output=None):
+    """
+    Returns the JSON result path for each maze in `paths`: beside the
+    maze, or under `output` in the same layout the mazes have below
+    their common directory, so mazes with the same name in different
+    directories do not overwrite each other. Names that would still
+    clash, such as "a.txt" and "a.maze", get a numeric suffix.
+    """
+    if output is not None and paths:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+    taken = set()
+    results = []
+    for path in paths:
+        if output is None:
+            base = os.path.splitext(path)[0]
+        else:
+            relative = os.path.relpath(os.path.abspath(path), root)
+            base = os.path.join(output, os.path.splitext(relative)[0])
+        destination = base + ".json"
+        n = 2
+        while os.path.normcase(os.path.abspath(destination)) in taken:
+            destination = f"{base}-{n}.json"
+            n += 1
+        taken.add(os.path.normcase(os.path.abspath(destination)))
+        results.append(destination)
+    return results
+
+
+def solve_job(job, algorithm="bfs"):
+    return solve_file(job[0], algorithm, destination=job[1])
+
+
+def solve_file(path, algorithm="bfs", output=None, destination=None):
+    """
+    Solves the maze at `path` and writes a JSON record of the path length,
+    states explored and timings to `destination`, which defaults to a
+    file named after the maze in `output` (or beside the maze).
+
+    A connected-component pass runs first, so a maze with no solution is
+    reported without searching it. Failures, including failing to write
+    the record, are returned as an "error" entry instead of raised.
+    """
+    if destination is None:
+        destination = result_paths([path], output)[0]
+    result = {"maze": path, "algorithm": algorithm}
+    try:
+        start = time.perf_counter()
+        m = maze.Maze(path)
+        result["load_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        connected = m.connected()
+        result["precheck_s"] = time.perf_counter() - start
+
+        if connected:
+            m.solve(algorithm)
+            result["solvable"] = True
+            result["length"] = len(m.solution[1])
+            result["explored"] = m.num_explored
+            result["solve_s"] = m.stats.wall_time
+        else:
+            result["solvable"] = False
+            result["length"] = None
+            result["explored"] = 0
+            result["solve_s"] = 0.0
+    except Exception as e:
+        result["error"] = str(e)
+
+    try:
+        directory = os.path.dirname(destination)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(destination, "w") as f:
+            json.dump(result, f, indent=2)
+    except OSError as e:
+        result["error"] = f"cannot write {destination}: {e}"
+    return result
+
+
+if __name__ == "__main__":
+    main()
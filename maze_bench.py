@@ -0,0 +1,320 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import time
+import tracemalloc
+
+import maze
+
+KINDS = ["backtracker", "prim", "rooms", "random"]
+
+# Moves between neighbouring cells of a generated maze
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maze generator and solver benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="write a corpus of mazes")
+    generate_parser.add_argument("directory")
+    generate_parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS)
+    generate_parser.add_argument("--sizes", nargs="+", type=int, default=[51, 201, 801],
+                                 help="side lengths of the mazes, in cells")
+    generate_parser.add_argument("--count", type=int, default=3,
+                                 help="mazes of each kind and size")
+    generate_parser.add_argument("--density", type=float, default=0.2,
+                                 help="fraction of obstacle cells in rooms and random mazes")
+    generate_parser.add_argument("--room-size", type=int, default=16)
+    generate_parser.add_argument("--seed", type=int, default=0)
+
+    run_parser = commands.add_parser("run", help="run every solver over a corpus")
+    run_parser.add_argument("directory")
+    run_parser.add_argument("--algos", nargs="+", choices=maze.ALGORITHMS,
+                            default=maze.ALGORITHMS)
+    run_parser.add_argument("--no-memory", dest="memory", action="store_false",
+                            help="skip the second, traced run measuring peak memory")
+    run_parser.add_argument("--output", metavar="FILE", help="write results as JSON")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        paths = generate(
+            args.directory, args.kinds, args.sizes, count=args.count,
+            density=args.density, room_size=args.room_size, seed=args.seed
+        )
+        print(f"Wrote {len(paths)} mazes to {args.directory}")
+    else:
+        results = run(args.directory, args.algos, memory=args.memory)
+        print_summary(results["summary"])
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+
+
+def generate(directory, kinds, sizes, count=3, density=0.2, room_size=16, seed=0):
+    """
+    Writes `count` mazes of every kind and size to `directory` as
+    "<kind>-<size>-<n>.txt" and returns their paths. Each maze gets its
+    own seed derived from `seed`, so a corpus can be regenerated exactly.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for kind in kinds:
+        for size in sizes:
+            for n in range(count):
+                rng = random.Random(f"{seed}-{kind}-{size}-{n}")
+                if kind == "backtracker":
+                    walls, start, goal = backtracker(size, size, rng)
+                elif kind == "prim":
+                    walls, start, goal = prim(size, size, rng)
+                elif kind == "rooms":
+                    walls, start, goal = rooms(size, size, rng, density, room_size)
+                else:
+                    walls, start, goal = scatter(size, size, rng, density)
+                path = os.path.join(directory, f"{kind}-{size}-{n}.txt")
+                write_maze(path, walls, start, goal)
+                paths.append(path)
+    return paths
+
+
+def carved_grid(height, width):
+    """
+    Returns an all-wall grid and the number of rows and columns of
+    carvable cells, which sit at odd coordinates between wall lines.
+    """
+    walls = [bytearray(b"\x01") * width for _ in range(height)]
+    return walls, (height - 1) // 2, (width - 1) // 2
+
+
+def backtracker(height, width, rng):
+    """
+    Carves a perfect maze with a randomized depth-first search, which
+    gives long, winding corridors with few branches.
+    """
+    walls, rows, cols = carved_grid(height, width)
+    visited = bytearray(rows * cols)
+    visited[0] = 1
+    walls[1][1] = 0
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        options = []
+        for dr, dc in DIRECTIONS:
+            r, c = row + dr, col + dc
+            if 0 <= r < rows and 0 <= c < cols and not visited[r * cols + c]:
+                options.append((r, c))
+        if not options:
+            stack.pop()
+            continue
+        r, c = rng.choice(options)
+        visited[r * cols + c] = 1
+        walls[2 * r + 1][2 * c + 1] = 0
+        walls[row + r + 1][col + c + 1] = 0
+        stack.append((r, c))
+    return walls, (1, 1), (2 * rows - 1, 2 * cols - 1)
+
+
+def prim(height, width, rng):
+    """
+    Carves a perfect maze with randomized Prim's algorithm, which gives
+    many short dead ends branching off the main paths.
+    """
+    walls, rows, cols = carved_grid(height, width)
+    visited = bytearray(rows * cols)
+
+    def visit(row, col):
+        visited[row * cols + col] = 1
+        walls[2 * row + 1][2 * col + 1] = 0
+        for dr, dc in DIRECTIONS:
+            r, c = row + dr, col + dc
+            if 0 <= r < rows and 0 <= c < cols and not visited[r * cols + c]:
+                edges.append((row, col, r, c))
+
+    edges = []
+    visit(0, 0)
+    while edges:
+        # Remove a random edge in O(1) by swapping it with the last one
+        i = rng.randrange(len(edges))
+        edges[i], edges[-1] = edges[-1], edges[i]
+        row, col, r, c = edges.pop()
+        if not visited[r * cols + c]:
+            walls[row + r + 1][col + c + 1] = 0
+            visit(r, c)
+    return walls, (1, 1), (2 * rows - 1, 2 * cols - 1)
+
+
+def rooms(height, width, rng, density=0.2, room_size=16):
+    """
+    Divides an open grid into rooms of about `room_size` cells, with one
+    doorway in each stretch of wall between rooms, and scatters
+    obstacles over a `density` fraction of the rooms' floor.
+    """
+    walls = [bytearray(width) for _ in range(height)]
+    room_size = max(2, room_size)
+    lines = set()
+    for row in range(height):
+        for col in range(width):
+            if row in (0, height - 1) or col in (0, width - 1) or \
+                    row % room_size == 0 or col % room_size == 0:
+                walls[row][col] = 1
+                lines.add((row, col))
+
+    # Open a doorway in every wall segment between two rooms
+    start, goal = (1, 1), (height - 2, width - 2)
+    doors = [start, goal]
+    for line in range(room_size, height - 1, room_size):
+        for first in range(0, width - 1, room_size):
+            end = min(first + room_size, width - 1)
+            if end - first > 1:
+                doors.append((line, rng.randrange(first + 1, end)))
+    for line in range(room_size, width - 1, room_size):
+        for first in range(0, height - 1, room_size):
+            end = min(first + room_size, height - 1)
+            if end - first > 1:
+                doors.append((rng.randrange(first + 1, end), line))
+
+    # Keep doorways, the start, the goal and the cells beside them clear
+    clear = set()
+    for row, col in doors:
+        walls[row][col] = 0
+        clear.add((row, col))
+        for dr, dc in DIRECTIONS:
+            clear.add((row + dr, col + dc))
+
+    for row in range(1, height - 1):
+        for col in range(1, width - 1):
+            if (row, col) not in lines and (row, col) not in clear and \
+                    rng.random() < density:
+                walls[row][col] = 1
+    return walls, start, goal
+
+
+def scatter(height, width, rng, density=0.2):
+    """
+    Fills an open grid with independent random obstacles at `density`.
+    """
+    walls = [bytearray(1 if rng.random() < density else 0 for _ in range(width))
+             for _ in range(height)]
+    start, goal = (0, 0), (height - 1, width - 1)
+    walls[start[0]][start[1]] = 0
+    walls[goal[0]][goal[1]] = 0
+    return walls, start, goal
+
+
+def write_maze(path, walls, start, goal):
+    """
+    Writes a grid of walls in the text format `maze.Maze` reads.
+    """
+    with open(path, "w") as f:
+        for i, row in enumerate(walls):
+            line = bytearray(row.translate(maze.TEXT_TABLE))
+            if i == start[0]:
+                line[start[1]] = ord("A")
+            if i == goal[0]:
+                line[goal[1]] = ord("B")
+            f.write(line.decode("ascii") + "\n")
+
+
+def run(directory, algorithms, memory=True):
+    """
+    Solves every maze in `directory` with each of `algorithms`, timing
+    each solve and, with `memory`, measuring its peak allocation in a
+    second run under tracemalloc. Returns a JSON-ready dictionary of the
+    per-maze results and a summary per algorithm, kind and size.
+    """
+    runs = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.txt"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        kind, size = name.split("-")[:2] if name.count("-") >= 2 else (name, "")
+        for algorithm in algorithms:
+            record = {"maze": path, "kind": kind, "size": size, "algorithm": algorithm}
+            try:
+                m = maze.Maze(path)
+                start = time.perf_counter()
+                try:
+                    m.solve(algorithm)
+                    record["length"] = len(m.solution[1])
+                except Exception as e:
+                    if str(e) != "no solution":
+                        raise
+                    record["length"] = None
+                record["time_s"] = time.perf_counter() - start
+                record["explored"] = m.num_explored
+                if memory:
+                    record["peak_kib"] = peak_memory(path, algorithm) / 1024
+            except ImportError as e:
+                record["error"] = str(e)
+            runs.append(record)
+
+    return {
+        "python": platform.python_version(),
+        "runs": runs,
+        "summary": summarize(runs)
+    }
+
+
+def peak_memory(path, algorithm):
+    """
+    Returns the peak bytes allocated while solving the maze at `path`.
+    """
+    m = maze.Maze(path)
+    tracemalloc.start()
+    try:
+        try:
+            m.solve(algorithm)
+        except Exception as e:
+            if str(e) != "no solution":
+                raise
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(runs):
+    """
+    Averages explored nodes, time and memory for each
+    (kind, size, algorithm) group of runs.
+    """
+    groups = {}
+    for record in runs:
+        if "error" in record:
+            continue
+        key = (record["kind"], record["size"], record["algorithm"])
+        groups.setdefault(key, []).append(record)
+
+    summary = []
+    for (kind, size, algorithm), records in sorted(groups.items(), key=group_order):
+        peaks = [record["peak_kib"] for record in records if "peak_kib" in record]
+        summary.append({
+            "kind": kind,
+            "size": size,
+            "algorithm": algorithm,
+            "mazes": len(records),
+            "solved": sum(1 for record in records if record["length"] is not None),
+            "explored": sum(record["explored"] for record in records) / len(records),
+            "time_ms": sum(record["time_s"] for record in records) / len(records) * 1000,
+            "peak_kib": sum(peaks) / len(peaks) if peaks else None
+        })
+    return summary
+
+
+def group_order(item):
+    (kind, size, algorithm), _ = item
+    return (kind, int(size) if size.isdigit() else 0, maze.ALGORITHMS.index(algorithm))
+
+
+def print_summary(summary):
+    print(f"{'kind':<12}{'size':>6}  {'algorithm':<10}{'solved':>8}"
+          f"{'explored':>12}{'time ms':>11}{'peak KiB':>11}")
+    for row in summary:
+        peak = "-" if row["peak_kib"] is None else f"{row['peak_kib']:.0f}"
+        print(f"{row['kind']:<12}{row['size']:>6}  {row['algorithm']:<10}"
+              f"{row['solved']:>4}/{row['mazes']:<3}{row['explored']:>12.0f}"
+              f"{row['time_ms']:>11.2f}{peak:>11}")
+
+
+if __name__ == "__main__":
+    main()
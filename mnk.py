@@ -0,0 +1,278 @@
+"""
+m,n,k-game Player
+
+Generalizes tictactoe.py to an m x n board won by k in a row, where full
+minimax is out of reach. Moves are chosen by iterative-deepening
+alpha-beta over a heuristic evaluation within a wall-clock budget.
+"""
+
+import argparse
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position; wins found sooner score higher
+WIN = 1000000
+
+# Search nodes between checks of the clock
+CLOCK_INTERVAL = 1024
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Board():
+    """
+    An m x n board, stored as a flat list of cells in row-major order.
+
+    Every run of k cells in a line is a window. For each window the board
+    counts the X and O pieces in it, so a move only updates the windows
+    through its cell: a window reaching k pieces is a win, and the
+    heuristic score is adjusted by the change in those windows alone.
+    """
+
+    def __init__(self, m=3, n=3, k=3):
+        if k > max(m, n):
+            raise ValueError("k must fit on the board")
+        self.height = m
+        self.width = n
+        self.k = k
+        self.cells = [EMPTY] * (m * n)
+        self.history = []
+        self.empty = m * n
+        self.won = None
+
+        self.windows = []
+        for row in range(m):
+            for col in range(n):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row, end_col = row + dr * (k - 1), col + dc * (k - 1)
+                    if 0 <= end_row < m and 0 <= end_col < n:
+                        self.windows.append(tuple(
+                            (row + dr * i) * n + col + dc * i for i in range(k)
+                        ))
+        self.cell_windows = [[] for _ in self.cells]
+        for w, window in enumerate(self.windows):
+            for cell in window:
+                self.cell_windows[cell].append(w)
+        self.counts = {X: [0] * len(self.windows), O: [0] * len(self.windows)}
+
+        # Open windows holding c pieces of one player are worth weights[c]
+        self.weights = [0] + [4 ** (c - 1) for c in range(1, k + 1)]
+        self.score = 0
+
+        # Cells nearest the center first, the usual best first guesses
+        center_row, center_col = (m - 1) / 2, (n - 1) / 2
+        self.order = sorted(
+            range(m * n),
+            key=lambda cell: abs(cell // n - center_row) + abs(cell % n - center_col)
+        )
+
+    @classmethod
+    def from_board(cls, board, k=3):
+        """
+        Returns the Board of a list-of-lists board such as tictactoe uses.
+        """
+        result = cls(len(board), len(board[0]), k)
+        pieces = {X: [], O: []}
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell is not EMPTY:
+                    pieces[cell].append(i * result.width + j)
+        if not 0 <= len(pieces[X]) - len(pieces[O]) <= 1:
+            raise ValueError("X moves first and players alternate")
+
+        # Replay the pieces alternately, as if they had been played in turn
+        for i, cell in enumerate(pieces[X]):
+            result.place(cell, X)
+            if i < len(pieces[O]):
+                result.place(pieces[O][i], O)
+        return result
+
+    def to_board(self):
+        return [self.cells[row * self.width:(row + 1) * self.width]
+                for row in range(self.height)]
+
+    def player(self):
+        return X if len(self.history) % 2 == 0 else O
+
+    def terminal(self):
+        return self.won is not None or self.empty == 0
+
+    def actions(self):
+        """
+        Returns the empty cells, nearest the center first.
+        """
+        return [cell for cell in self.order if self.cells[cell] is EMPTY]
+
+    def play(self, cell):
+        """
+        Places the next player's piece on `cell`.
+        """
+        if self.cells[cell] is not EMPTY or self.won is not None:
+            raise ValueError(f"cannot play cell {cell}")
+        self.place(cell, self.player())
+
+    def place(self, cell, piece):
+        """
+        Puts `piece` on `cell`, updating the window counts, score and
+        winner through that cell only.
+        """
+        other = O if piece == X else X
+        sign = 1 if piece == X else -1
+        mine, theirs = self.counts[piece], self.counts[other]
+        for w in self.cell_windows[cell]:
+            if theirs[w] == 0:
+                self.score += sign * (self.weights[mine[w] + 1] - self.weights[mine[w]])
+            elif mine[w] == 0:
+                # The window was open to the other player and now is dead
+                self.score += sign * self.weights[theirs[w]]
+            mine[w] += 1
+            if mine[w] == self.k:
+                self.won = piece
+        self.cells[cell] = piece
+        self.history.append(cell)
+        self.empty -= 1
+
+    def undo(self):
+        cell = self.history.pop()
+        piece = self.cells[cell]
+        other = O if piece == X else X
+        sign = 1 if piece == X else -1
+        mine, theirs = self.counts[piece], self.counts[other]
+        for w in self.cell_windows[cell]:
+            mine[w] -= 1
+            if theirs[w] == 0:
+                self.score -= sign * (self.weights[mine[w] + 1] - self.weights[mine[w]])
+            elif mine[w] == 0:
+                self.score -= sign * self.weights[theirs[w]]
+        self.cells[cell] = EMPTY
+        self.empty += 1
+        self.won = None
+
+
+class Search():
+    """
+    Iterative-deepening negamax alpha-beta over a `Board` with a deadline.
+    """
+
+    def __init__(self, board, budget):
+        self.board = board
+        self.deadline = time.perf_counter() + budget
+        self.nodes = 0
+
+    def run(self, max_depth=None):
+        """
+        Searches one ply deeper at a time until the budget runs out, the
+        game is solved or `max_depth` is reached. Returns the best move of
+        the deepest completed iteration, its value for the player to move
+        and that depth.
+        """
+        moves = self.board.actions()
+        best_move, best_value, depth = moves[0], 0, 0
+        limit = self.board.empty if max_depth is None else min(max_depth, self.board.empty)
+        for target in range(1, limit + 1):
+            try:
+                move, value = self.root(moves, target)
+            except SearchTimeout:
+                break
+            best_move, best_value, depth = move, value, target
+
+            # Try the best move first next time; stop once the result is certain
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(value) >= WIN - self.board.height * self.board.width:
+                break
+        return best_move, best_value, depth
+
+    def root(self, moves, depth):
+        alpha = -WIN - 1
+        best_move = moves[0]
+        for move in moves:
+            self.board.play(move)
+            try:
+                value = -self.negamax(depth - 1, -WIN - 1, -alpha, 1)
+            finally:
+                self.board.undo()
+            if value > alpha:
+                alpha = value
+                best_move = move
+        return best_move, alpha
+
+    def negamax(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes % CLOCK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        board = self.board
+        if board.won is not None:
+            # The player who just moved has won
+            return -(WIN - ply)
+        if board.empty == 0:
+            return 0
+        if depth == 0:
+            return board.score if board.player() == X else -board.score
+
+        best = -WIN - 1
+        for move in board.actions():
+            board.play(move)
+            try:
+                value = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.undo()
+            if value > best:
+                best = value
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+        return best
+
+
+def best_move(board, budget=1.0, max_depth=None):
+    """
+    Returns the move chosen for the player to move on `board` within
+    `budget` seconds, as (cell, value, depth searched, nodes searched).
+    """
+    if board.terminal():
+        return None, None, 0, 0
+    search = Search(board, budget)
+    move, value, depth = search.run(max_depth)
+    return move, value, depth, search.nodes
+
+
+def best_action(board, k=3, budget=1.0):
+    """
+    Returns the (i, j) action chosen on a list-of-lists board, or None if
+    the game is over.
+    """
+    state = Board.from_board(board, k)
+    move = best_move(state, budget)[0]
+    return None if move is None else divmod(move, state.width)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play an m,n,k-game against itself")
+    parser.add_argument("--m", type=int, default=4, help="rows")
+    parser.add_argument("--n", type=int, default=4, help="columns")
+    parser.add_argument("--k", type=int, default=3, help="pieces in a row to win")
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds per move")
+    args = parser.parse_args()
+
+    board = Board(args.m, args.n, args.k)
+    while not board.terminal():
+        piece = board.player()
+        move, value, depth, nodes = best_move(board, args.budget)
+        board.play(move)
+        print(f"{piece} plays {divmod(move, board.width)} "
+              f"(depth {depth}, {nodes} nodes, value {value})")
+    for row in board.to_board():
+        print(" ".join(cell or "." for cell in row))
+    print(f"Winner: {board.won}" if board.won else "Draw")
+
+
+if __name__ == "__main__":
+    main()
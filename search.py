@@ -0,0 +1,177 @@
+"""
+Generic, instrumented graph search shared by maze.py and degrees.py.
+
+A problem is described by a start state, a goal test and a successor
+function yielding (action, state) pairs, plus an optional step cost and
+heuristic. `graph_search` runs BFS, DFS, uniform-cost, greedy best-first
+or A* over it and reports what the search cost in a `SearchStats`.
+"""
+
+import time
+import tracemalloc
+
+from util import NodeArena, StackFrontier, QueueFrontier, PriorityFrontier
+
+ALGORITHMS = ["bfs", "dfs", "ucs", "greedy", "astar"]
+
+
+class SearchStats():
+    """
+    Counters for a single search run.
+        - `nodes_expanded`: nodes removed from the frontier
+        - `peak_frontier`: largest number of nodes waiting in the frontier
+        - `peak_memory`: peak bytes allocated while searching, if tracked
+        - `wall_time`: seconds spent searching
+    """
+
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.nodes_expanded = 0
+        self.peak_frontier = 0
+        self.peak_memory = None
+        self.wall_time = 0.0
+
+    def as_dict(self):
+        return {
+            "algorithm": self.algorithm,
+            "nodes_expanded": self.nodes_expanded,
+            "peak_frontier": self.peak_frontier,
+            "peak_memory": self.peak_memory,
+            "wall_time": self.wall_time
+        }
+
+
+class SearchResult():
+    """
+    Outcome of `graph_search`. If a goal was reached, `actions` and `states`
+    hold the path from (but excluding) the start state and `cost` its total
+    step cost; otherwise they are None. `explored` is the set of expanded
+    states and `stats` the run's `SearchStats`.
+    """
+
+    def __init__(self, actions, states, cost, explored, stats):
+        self.actions = actions
+        self.states = states
+        self.cost = cost
+        self.explored = explored
+        self.stats = stats
+
+    @property
+    def found(self):
+        return self.states is not None
+
+
+def graph_search(start, goal_test, successors, algorithm="bfs",
+                 cost=None, heuristic=None, track_memory=False):
+    """
+    Searches from `start` until `goal_test(state)` holds.
+
+    `successors(state)` yields (action, state) pairs. `cost(state, action,
+    next_state)` gives step costs (1 if omitted) and `heuristic(state)`
+    estimates the remaining cost for "greedy" and "astar".
+    With `track_memory`, peak allocation is measured with tracemalloc,
+    which slows the search down considerably.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"unknown algorithm: {algorithm}")
+    if algorithm in ("greedy", "astar") and heuristic is None:
+        raise ValueError(f"{algorithm} needs a heuristic")
+
+    stats = SearchStats(algorithm)
+    started_tracing = False
+    if track_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    start_time = time.perf_counter()
+    try:
+        if algorithm in ("bfs", "dfs"):
+            result = uninformed_search(start, goal_test, successors, algorithm, stats)
+        else:
+            result = best_first_search(
+                start, goal_test, successors, algorithm, cost, heuristic, stats
+            )
+    finally:
+        stats.wall_time = time.perf_counter() - start_time
+        if track_memory:
+            stats.peak_memory = tracemalloc.get_traced_memory()[1] - baseline
+            if started_tracing:
+                tracemalloc.stop()
+    return result
+
+
+def uninformed_search(start, goal_test, successors, algorithm, stats):
+    """
+    Breadth- or depth-first search, testing for the goal
+    as each node leaves the frontier.
+    """
+    nodes = NodeArena()
+    state_of = nodes.states.__getitem__
+    frontier = QueueFrontier(state_of) if algorithm == "bfs" else StackFrontier(state_of)
+    frontier.add(nodes.add(start, None, None))
+    explored = set()
+
+    while not frontier.empty():
+        node = frontier.remove()
+        stats.nodes_expanded += 1
+        current = state_of(node)
+
+        if goal_test(current):
+            actions, states = nodes.path(node)
+            return SearchResult(actions, states, len(states), explored, stats)
+
+        explored.add(current)
+        for action, state in successors(current):
+            if not frontier.contains_state(state) and state not in explored:
+                frontier.add(nodes.add(state, node, action))
+        if len(frontier) > stats.peak_frontier:
+            stats.peak_frontier = len(frontier)
+
+    return SearchResult(None, None, None, explored, stats)
+
+
+def best_first_search(start, goal_test, successors, algorithm, cost, heuristic, stats):
+    """
+    Uniform-cost, greedy best-first or A* search over a `PriorityFrontier`,
+    keeping the cheapest known cost to each state.
+    """
+    def priority(g, state):
+        if algorithm == "ucs":
+            return g
+        if algorithm == "greedy":
+            return heuristic(state)
+        return g + heuristic(state)
+
+    nodes = NodeArena()
+    state_of = nodes.states.__getitem__
+    frontier = PriorityFrontier(state_of)
+    frontier.add(nodes.add(start, None, None), priority(0, start))
+    best = {start: 0}
+    explored = set()
+
+    while not frontier.empty():
+        node = frontier.remove()
+        stats.nodes_expanded += 1
+        current = state_of(node)
+        g = best[current]
+
+        if goal_test(current):
+            actions, states = nodes.path(node)
+            return SearchResult(actions, states, g, explored, stats)
+
+        explored.add(current)
+        for action, state in successors(current):
+            if state in explored or (algorithm == "greedy" and state in best):
+                continue
+            step = 1 if cost is None else cost(current, action, state)
+            if g + step < best.get(state, float("inf")):
+                best[state] = g + step
+                frontier.add(nodes.add(state, node, action), priority(g + step, state))
+        if len(frontier) > stats.peak_frontier:
+            stats.peak_frontier = len(frontier)
+
+    return SearchResult(None, None, None, explored, stats)
+
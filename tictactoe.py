@@ -2,13 +2,25 @@
 Tic Tac Toe Player
 """
 
+import argparse
 import copy
 import math
+import mmap
+import os
+import struct
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Perfect-play table: one byte per base-3 board encoding, holding
+# (value + 1) << 4 | move for reachable positions and NO_ENTRY otherwise
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tictactoe.table")
+TABLE_MAGIC = b"TTTTABLE"
+TABLE_VERSION = 1
+TABLE_SIZE = 3 ** 9
+NO_ENTRY = 0xFF
+
 
 def initial_state():
     """
@@ -81,34 +93,7 @@ def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    possible_winner = EMPTY
-    
-    #Check possible winner in the rows of the board:
-    if board[0][0] == board[0][1] and board[0][1] == board[0][2]:
-        possible_winner = board[0][0]
-    elif board[1][0] == board[1][1] and board[1][1] == board[1][2]:
-        possible_winner = board[1][0]
-    elif board[2][0] == board[2][1] and board[2][1] == board[2][2]:
-        possible_winner = board[2][0]
-    #Check possible winner in the columns of the board:
-    elif board[0][0] == board[1][0] and board[1][0] == board[2][0]:
-        possible_winner = board[0][0]
-    elif board[0][1] == board[1][1] and board[1][1] == board[2][1]:
-        possible_winner = board[0][1]
-    elif board[0][2] == board[1][2] and board[1][2] == board[2][2]:
-        possible_winner = board[0][2]
-    #Check possible winner in the diagonals of the board:
-    elif board[0][0] == board[1][1] and board[1][1] == board[2][2]:
-        possible_winner = board[0][0]
-    elif board[0][2] == board[1][1] and board[1][1] == board[2][0]:
-        possible_winner = board[0][2]
-        
-    if possible_winner != EMPTY:
-        return possible_winner
-    else:
-        return None
-    
-    raise NotImplementedError
+    return line_winner(flatten(board))
 
 
 def terminal(board):
@@ -136,45 +121,396 @@ def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
-    optimal_result = tuple()
-    
-    def maxvalue(state):        
-        v = -math.inf                
-        
-        for action in actions(state):
-            if terminal(result(state, action)):
-                return utility(result(state, action)),action
-            else:
-                min_result = minvalue(result(state,action))
-            
-                if min_result[0] > v:
-                    optimal = action
-                    v = min_result[0]                            
-        return v,optimal
-    
-    def minvalue(state):
-        
-        v = math.inf            
-        
-        for action in actions(state):
-            if terminal(result(state, action)):
-                return utility(result(state, action)), action
-            max_result = maxvalue(result(state,action))
-            if max_result[0] < v:
-                optimal = action
-                v = max_result[0]                            
-        return v,optimal
-    
+    # Look the position up in the perfect-play table if there is one;
+    # terminal positions have no move there and fall through to the search
+    entry = lookup(flatten(board))
+    if entry is not None:
+        return divmod(entry[1], 3)
+    return search_minimax(board)
+
+
+def search_minimax(board):
+    """
+    Returns the optimal action for the current player on the board,
+    searching for it rather than reading the perfect-play table.
+    """
     if terminal(board):
         return None
+
+    # Score each move by the memoized value of the position it leads to
+    cells = flatten(board)
+    turn = player(board)
+    best_value = None
+    optimal = None
+    for action in actions(board):
+        i = action[0] * 3 + action[1]
+        child = value(cells[:i] + (turn,) + cells[i + 1:])
+        if best_value is None or (child > best_value if turn == X else child < best_value):
+            best_value = child
+            optimal = action
+    return optimal
+
+
+# The 8 rotations and reflections of the board, each as the flat cell
+# index read into every position of the transformed board
+SYMMETRIES = []
+for transform in [
+    lambda i, j: (i, j), lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j), lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j), lambda i, j: (2 - i, j),
+    lambda i, j: (j, i), lambda i, j: (2 - j, 2 - i)
+]:
+    SYMMETRIES.append(tuple(
+        row * 3 + col for row, col in (transform(i, j) for i in range(3) for j in range(3))
+    ))
+
+# Flat cell indices of the rows, columns and diagonals
+LINES = [
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6)
+]
+
+CODES = {EMPTY: 0, X: 1, O: 2}
+
+# Minimax values by canonical position, shared by every call in this process
+TRANSPOSITIONS = {}
+TRANSPOSITION_STATS = {"hits": 0, "misses": 0}
+
+
+def flatten(board):
+    """
+    Returns the board as a tuple of its 9 cells in row-major order.
+    """
+    return tuple(cell for row in board for cell in row)
+
+
+def line_winner(cells):
+    """
+    Returns the player holding a whole row, column or
+    diagonal of the flat board `cells`, or None.
+    """
+    for a, b, c in LINES:
+        if cells[a] is not EMPTY and cells[a] == cells[b] == cells[c]:
+            return cells[a]
+    return None
+
+
+def canonical(cells):
+    """
+    Returns the smallest base-3 encoding of the flat board `cells` over
+    its 8 symmetries, so boards that are rotations or reflections of one
+    another share a key.
+    """
+    codes = [CODES[cell] for cell in cells]
+    key = None
+    for symmetry in SYMMETRIES:
+        code = 0
+        for index in symmetry:
+            code = code * 3 + codes[index]
+        if key is None or code < key:
+            key = code
+    return key
+
+
+def value(cells):
+    """
+    Returns the utility of the flat board `cells` under perfect play,
+    evaluating each distinct position at most once per process.
+    """
+    key = canonical(cells)
+    if key in TRANSPOSITIONS:
+        TRANSPOSITION_STATS["hits"] += 1
+        return TRANSPOSITIONS[key]
+    TRANSPOSITION_STATS["misses"] += 1
+
+    won = line_winner(cells)
+    if won is not None:
+        result_value = 1 if won == X else -1
+    elif EMPTY not in cells:
+        result_value = 0
     else:
-        if player(board) == X:
-            optimal_result = maxvalue(board)
+        turn = X if cells.count(X) <= cells.count(O) else O
+        children = [
+            value(cells[:i] + (turn,) + cells[i + 1:])
+            for i in range(9) if cells[i] is EMPTY
+        ]
+        result_value = max(children) if turn == X else min(children)
+
+    TRANSPOSITIONS[key] = result_value
+    return result_value
+
+
+def alphabeta(board, ordering="static", stats=None):
+    """
+    Returns the optimal action for the current player on the board, found
+    with alpha-beta pruning instead of the transposition table.
+
+    Root moves are tried in `actions(board)` order and only replaced by a
+    strictly better one, so the action matches `minimax`. Deeper down,
+    `ordering` picks the move order (see ORDERINGS). If `stats` is a dict,
+    the number of positions searched is added to its "nodes" entry.
+    """
+    if ordering not in ORDERINGS:
+        raise ValueError(f"unknown ordering: {ordering}")
+    if terminal(board):
+        return None
+
+    search = AlphaBeta(ordering)
+    cells = flatten(board)
+    turn = player(board)
+    best_value = None
+    optimal = None
+    for action in actions(board):
+        i = action[0] * 3 + action[1]
+        child = cells[:i] + (turn,) + cells[i + 1:]
+
+        # A child only needs an exact value if it might beat the best so far
+        if turn == X:
+            bound = -math.inf if best_value is None else best_value
+            child_value = search.value(child, bound, 1, 1)
+            better = best_value is None or child_value > best_value
         else:
-            optimal_result = minvalue(board)
-        
-        return optimal_result[1]
-        
-    
-    
-    raise NotImplementedError
+            bound = math.inf if best_value is None else best_value
+            child_value = search.value(child, -1, bound, 1)
+            better = best_value is None or child_value < best_value
+        if better:
+            best_value = child_value
+            optimal = action
+
+    if stats is not None:
+        stats["nodes"] = stats.get("nodes", 0) + search.nodes
+    return optimal
+
+
+# Move orderings for alpha-beta:
+#   - "none": board order
+#   - "static": center, then corners, then edges
+#   - "killer": static, after the last move that caused a cutoff at this depth
+#   - "history": static, reordered by how often each cell caused cutoffs
+ORDERINGS = ["none", "static", "killer", "history"]
+STATIC_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+
+class AlphaBeta():
+    """
+    Alpha-beta search over flat boards that counts the positions it visits
+    and keeps the killer moves and history scores its ordering uses.
+    """
+
+    def __init__(self, ordering="static"):
+        self.ordering = ordering
+        self.nodes = 0
+        self.killers = [None] * 10
+        self.history = [0] * 9
+
+    def value(self, cells, alpha, beta, ply):
+        """
+        Returns the utility of `cells` if it lies strictly between `alpha`
+        and `beta`, otherwise a bound on the far side of the window.
+        """
+        self.nodes += 1
+        won = line_winner(cells)
+        if won is not None:
+            return 1 if won == X else -1
+        moves = self.order(cells, ply)
+        if not moves:
+            return 0
+
+        turn = X if cells.count(X) <= cells.count(O) else O
+        best = -math.inf if turn == X else math.inf
+        for i in moves:
+            child = self.value(cells[:i] + (turn,) + cells[i + 1:], alpha, beta, ply + 1)
+            if turn == X:
+                best = max(best, child)
+                alpha = max(alpha, child)
+            else:
+                best = min(best, child)
+                beta = min(beta, child)
+            if alpha >= beta:
+                self.killers[ply] = i
+                self.history[i] += len(moves) ** 2
+                break
+        return best
+
+    def order(self, cells, ply):
+        """
+        Returns the empty cells of `cells` in the order to search them.
+        """
+        if self.ordering == "none":
+            return [i for i in range(9) if cells[i] is EMPTY]
+        moves = [i for i in STATIC_ORDER if cells[i] is EMPTY]
+        if self.ordering == "killer":
+            killer = self.killers[ply]
+            if killer is not None and cells[killer] is EMPTY:
+                moves.remove(killer)
+                moves.insert(0, killer)
+        elif self.ordering == "history":
+            moves.sort(key=lambda i: -self.history[i])
+        return moves
+
+
+def count_nodes(cells):
+    """
+    Returns the number of positions plain minimax visits from the flat
+    board `cells`, without pruning or a transposition table.
+    """
+    if line_winner(cells) is not None or EMPTY not in cells:
+        return 1
+    turn = X if cells.count(X) <= cells.count(O) else O
+    return 1 + sum(
+        count_nodes(cells[:i] + (turn,) + cells[i + 1:])
+        for i in range(9) if cells[i] is EMPTY
+    )
+
+
+def search_report(board):
+    """
+    Returns the positions searched to choose a move on `board` by plain
+    minimax and by alpha-beta under each ordering, with the chosen actions.
+    """
+    report = {"minimax": {"nodes": count_nodes(flatten(board)) - 1, "action": minimax(board)}}
+    for ordering in ORDERINGS:
+        stats = {}
+        action = alphabeta(board, ordering, stats)
+        report[f"alphabeta/{ordering}"] = {"nodes": stats["nodes"], "action": action}
+    return report
+
+
+def transposition_stats():
+    """
+    Returns the size of the shared transposition table and its hits,
+    misses and hit rate so far.
+    """
+    lookups = TRANSPOSITION_STATS["hits"] + TRANSPOSITION_STATS["misses"]
+    return {
+        "size": len(TRANSPOSITIONS),
+        "hits": TRANSPOSITION_STATS["hits"],
+        "misses": TRANSPOSITION_STATS["misses"],
+        "hit_rate": TRANSPOSITION_STATS["hits"] / lookups if lookups else 0.0
+    }
+
+
+def clear_transpositions():
+    """
+    Empties the shared transposition table and resets its statistics.
+    """
+    TRANSPOSITIONS.clear()
+    TRANSPOSITION_STATS["hits"] = 0
+    TRANSPOSITION_STATS["misses"] = 0
+
+
+# Memory-mapped perfect-play table, None if it is missing or unusable;
+# read on first use
+TABLE = {"entries": None, "loaded": False}
+
+
+def encode(cells):
+    """
+    Returns the base-3 encoding of the flat board `cells`, in row-major
+    order with the first cell most significant.
+    """
+    code = 0
+    for cell in cells:
+        code = code * 3 + CODES[cell]
+    return code
+
+
+def build_table(path=TABLE_FILE):
+    """
+    Enumerates every position reachable from the empty board, stores the
+    value and the move `search_minimax` picks for each in the table file
+    at `path`, and returns the number of positions stored. The file is
+    replaced atomically.
+    """
+    entries = bytearray([NO_ENTRY]) * TABLE_SIZE
+    stack = [initial_state()]
+    while stack:
+        board = stack.pop()
+        cells = flatten(board)
+        code = encode(cells)
+        if entries[code] != NO_ENTRY:
+            continue
+        if terminal(board):
+            entries[code] = (utility(board) + 1) << 4 | 0xF
+            continue
+        action = search_minimax(board)
+        entries[code] = (value(cells) + 1) << 4 | (action[0] * 3 + action[1])
+        for move in actions(board):
+            stack.append(result(board, move))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(TABLE_MAGIC)
+        f.write(struct.pack("<II", TABLE_VERSION, TABLE_SIZE))
+        f.write(entries)
+    os.replace(tmp_path, path)
+    load_table(path)
+    return TABLE_SIZE - entries.count(NO_ENTRY)
+
+
+def load_table(path=TABLE_FILE):
+    """
+    Memory-maps the perfect-play table at `path` for `minimax` to use.
+    Returns False, leaving `minimax` to search, if there is no usable
+    table there.
+    """
+    TABLE["entries"] = None
+    TABLE["loaded"] = True
+    try:
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return False
+
+    prefix = len(TABLE_MAGIC) + 8
+    if len(mapping) != prefix + TABLE_SIZE or mapping[:len(TABLE_MAGIC)] != TABLE_MAGIC:
+        return False
+    version, size = struct.unpack("<II", mapping[len(TABLE_MAGIC):prefix])
+    if version != TABLE_VERSION or size != TABLE_SIZE:
+        return False
+    TABLE["entries"] = memoryview(mapping)[prefix:]
+    return True
+
+
+def lookup(cells):
+    """
+    Returns the (value, move) the perfect-play table holds for the flat
+    board `cells`, with the move as a cell index, or None if there is no
+    table or no entry for a move there.
+    """
+    if not TABLE["loaded"]:
+        load_table()
+    entries = TABLE["entries"]
+    if entries is None:
+        return None
+    entry = entries[encode(cells)]
+    if entry == NO_ENTRY or entry & 0xF > 8:
+        return None
+    return (entry >> 4) - 1, entry & 0xF
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic Tac Toe search tools")
+    parser.add_argument("--build-table", nargs="?", const=TABLE_FILE, metavar="PATH",
+                        help="write the perfect-play table minimax reads")
+    args = parser.parse_args()
+
+    if args.build_table:
+        count = build_table(args.build_table)
+        print(f"Stored {count} positions in {args.build_table}")
+        return
+
+    boards = [
+        ("empty board", initial_state()),
+        ("X in a corner", result(initial_state(), (0, 0))),
+        ("X center, O corner, X edge", result(result(result(initial_state(), (1, 1)), (0, 0)), (0, 1)))
+    ]
+    for name, board in boards:
+        print(name)
+        for search, row in search_report(board).items():
+            print(f"  {search:<20}{row['nodes']:>9} nodes  action {row['action']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Tic Tac Toe Player over bitboards
+
+A position is a pair of 9-bit integers (x, o), one bit per cell in
+row-major order: cell (i, j) is bit 3 * i + j. The functions named as in
+tictactoe.py take and return the usual list-of-lists boards, so callers
+of that module can use this one instead.
+"""
+
+import tictactoe
+
+X = tictactoe.X
+O = tictactoe.O
+EMPTY = tictactoe.EMPTY
+
+FULL = 0b111111111
+
+# Bits of the rows, columns and diagonals
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
+
+# Whether each 9-bit set of one player's cells contains a whole line
+HAS_LINE = bytes(
+    any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL + 1)
+)
+
+# Number of cells in each 9-bit set
+POPCOUNT = bytes(bin(bits).count("1") for bits in range(FULL + 1))
+
+# Minimax values of positions, indexed by x | o << 9 and stored as
+# value + 2, so 0 means not yet computed
+VALUES = bytearray(1 << 18)
+
+
+def from_board(board):
+    """
+    Returns the (x, o) bitboards of a list-of-lists board.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """
+    Returns the list-of-lists board of the bitboards (x, o).
+    """
+    return [
+        [X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY
+         for j in range(3)]
+        for i in range(3)
+    ]
+
+
+def turn(x, o):
+    """
+    Returns the player to move: X unless X has more cells than O.
+    """
+    return O if POPCOUNT[x] > POPCOUNT[o] else X
+
+
+def moves(x, o):
+    """
+    Yields the index of every empty cell, lowest first, by
+    repeatedly isolating the lowest set bit of the empty cells.
+    """
+    empty = FULL & ~(x | o)
+    while empty:
+        low = empty & -empty
+        yield low.bit_length() - 1
+        empty ^= low
+
+
+def play(x, o, move):
+    """
+    Returns the bitboards after the player to move takes cell `move`.
+    """
+    bit = 1 << move
+    if (x | o) & bit:
+        raise ValueError(f"cell {move} is taken")
+    if turn(x, o) == X:
+        return x | bit, o
+    return x, o | bit
+
+
+def bits_winner(x, o):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if HAS_LINE[x]:
+        return X
+    if HAS_LINE[o]:
+        return O
+    return None
+
+
+def bits_terminal(x, o):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return bool(HAS_LINE[x] or HAS_LINE[o]) or (x | o) == FULL
+
+
+def bits_utility(x, o):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    if HAS_LINE[x]:
+        return 1
+    if HAS_LINE[o]:
+        return -1
+    return 0
+
+
+def bits_value(x, o):
+    """
+    Returns the utility of (x, o) under perfect play, computing each
+    position at most once per process.
+    """
+    key = x | o << 9
+    stored = VALUES[key]
+    if stored:
+        return stored - 2
+
+    if bits_terminal(x, o):
+        result_value = bits_utility(x, o)
+    elif turn(x, o) == X:
+        result_value = max(bits_value(x | 1 << move, o) for move in moves(x, o))
+    else:
+        result_value = min(bits_value(x, o | 1 << move) for move in moves(x, o))
+
+    VALUES[key] = result_value + 2
+    return result_value
+
+
+def bits_minimax(x, o, candidates=None):
+    """
+    Returns the index of an optimal move for the player to move, or None
+    if the game is over. Moves are considered in the order of
+    `candidates` (default: lowest cell first) and ties keep the earliest.
+    """
+    if bits_terminal(x, o):
+        return None
+    maximizing = turn(x, o) == X
+    best_value = None
+    optimal = None
+    for move in (moves(x, o) if candidates is None else candidates):
+        child = bits_value(*play(x, o, move))
+        if best_value is None or (child > best_value if maximizing else child < best_value):
+            best_value = child
+            optimal = move
+    return optimal
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return tictactoe.initial_state()
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return turn(*from_board(board))
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {divmod(move, 3) for move in moves(*from_board(board))}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    return to_board(*play(*from_board(board), 3 * action[0] + action[1]))
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    return bits_winner(*from_board(board))
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return bits_terminal(*from_board(board))
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return bits_utility(*from_board(board))
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board,
+    breaking ties in the same order as tictactoe.minimax.
+    """
+    candidates = [3 * i + j for i, j in tictactoe.actions(board)]
+    move = bits_minimax(*from_board(board), candidates)
+    return None if move is None else divmod(move, 3)
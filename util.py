@@ -1,31 +1,128 @@
+import heapq
+import itertools
+
+from array import array
+from collections import deque
+
+
 class Node():
+    __slots__ = ("state", "parent", "action")
+
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
         self.action = action
 
 
-class StackFrontier():
+class NodeArena():
+    """
+    Compact store of search nodes as parallel arrays, addressed by integer
+    node ids: the state, the parent's id (-1 for a root) and an interned
+    action id. Paths are rebuilt by following integer parent links, so no
+    per-node Python object is kept alive.
+    """
+
     def __init__(self):
-        self.frontier = []
+        self.states = []
+        self.parents = array("i")
+        self.action_ids = array("i")
+        self.actions = []
+        self.action_index = {}
+
+    def add(self, state, parent, action):
+        """
+        Stores a node and returns its id. `parent` is a node id or None.
+        """
+        action_id = self.action_index.get(action)
+        if action_id is None:
+            action_id = len(self.actions)
+            self.action_index[action] = action_id
+            self.actions.append(action)
+        self.states.append(state)
+        self.parents.append(-1 if parent is None else parent)
+        self.action_ids.append(action_id)
+        return len(self.states) - 1
+
+    def state(self, node):
+        return self.states[node]
+
+    def parent(self, node):
+        parent = self.parents[node]
+        return None if parent == -1 else parent
+
+    def action(self, node):
+        return self.actions[self.action_ids[node]]
+
+    def node(self, node):
+        """
+        Returns a `Node` chain equivalent to node id `node`, built from
+        the root down so that long paths do not recurse.
+        """
+        chain = [node]
+        while self.parents[chain[-1]] != -1:
+            chain.append(self.parents[chain[-1]])
+        result = None
+        for node in reversed(chain):
+            result = Node(state=self.states[node], parent=result, action=self.action(node))
+        return result
+
+    def path(self, node):
+        """
+        Returns the (actions, states) leading from the root to `node`.
+        """
+        actions = []
+        states = []
+        while self.parents[node] != -1:
+            actions.append(self.actions[self.action_ids[node]])
+            states.append(self.states[node])
+            node = self.parents[node]
+        actions.reverse()
+        states.reverse()
+        return actions, states
+
+    def __len__(self):
+        return len(self.states)
+
+
+class StackFrontier():
+    def __init__(self, state_of=None):
+        self.frontier = deque()
+
+        # Number of frontier nodes holding each state, for O(1) membership
+        self.states = {}
+
+        # How to read a node's state; lets the frontier hold `NodeArena` ids
+        self.state_of = state_of if state_of is not None else node_state
 
     def add(self, node):
         self.frontier.append(node)
+        state = self.state_of(node)
+        self.states[state] = self.states.get(state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
 
+    def __len__(self):
+        return len(self.frontier)
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.forget(self.state_of(node))
             return node
 
+    def forget(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
 
 class QueueFrontier(StackFrontier):
 
@@ -33,6 +130,69 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.forget(self.state_of(node))
             return node
+
+
+class PriorityFrontier():
+    """
+    Binary-heap frontier that removes the node with the lowest priority.
+
+    Each state is held at most once. Adding a state that is already in the
+    frontier with a lower priority replaces it (decrease-key); the old heap
+    entry is marked stale and skipped when it surfaces. Ties are broken
+    first-in, first-out.
+    """
+
+    def __init__(self, state_of=None):
+        self.heap = []
+        self.entries = {}
+        self.counter = itertools.count()
+        self.state_of = state_of if state_of is not None else node_state
+
+    def add(self, node, priority=0):
+        """
+        Adds `node` with `priority`. Returns False, leaving the frontier
+        unchanged, if its state is already queued at an equal or lower
+        priority.
+        """
+        state = self.state_of(node)
+        entry = self.entries.get(state)
+        if entry is not None:
+            if entry[0] <= priority:
+                return False
+            entry[2] = None
+        entry = [priority, next(self.counter), node]
+        self.entries[state] = entry
+        heapq.heappush(self.heap, entry)
+        return True
+
+    def contains_state(self, state):
+        return state in self.entries
+
+    def priority(self, state):
+        """
+        Returns the priority `state` is queued at, or None.
+        """
+        entry = self.entries.get(state)
+        return None if entry is None else entry[0]
+
+    def empty(self):
+        return len(self.entries) == 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        while True:
+            _, _, node = heapq.heappop(self.heap)
+            if node is not None:
+                del self.entries[self.state_of(node)]
+                return node
+
+
+def node_state(node):
+    return node.state